@@ -0,0 +1,177 @@
+import argparse
+import os
+import re
+import sys
+from datetime import date
+import mysql.connector
+import config
+import db_helper
+import export
+from db_helper import get_db_cursor, logger
+
+
+PARTITIONED_TABLES = ("expenses", "expense_daily_rollup")
+YEAR_PARTITION = re.compile(r"^p(\d{4})$")
+DELETE_CHUNK = 10000
+
+
+def archive_path(year, archive_dir=None):
+    return os.path.abspath(os.path.join(archive_dir or config.ARCHIVE_DIR, f"expenses_{year}.parquet"))
+
+
+def is_closed(year, today=None):
+    return year <= (today or date.today()).year - config.ARCHIVE_KEEP_YEARS
+
+
+def _partition_names(cursor, table):
+    cursor.execute(
+        '''SELECT PARTITION_NAME AS name FROM information_schema.PARTITIONS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL''',
+        (table,)
+    )
+    return {row['name'] for row in cursor.fetchall()}
+
+
+def add_year_partitions(through_year):
+    """Split one partition per year up to ``through_year`` off the catch-all p_future."""
+    added = {}
+    for table in PARTITIONED_TABLES:
+        with get_db_cursor(commit=True) as cursor:
+            years = [int(m.group(1)) for m in map(YEAR_PARTITION.match, _partition_names(cursor, table)) if m]
+            new_years = list(range(max(years) + 1, through_year + 1))
+            if new_years:
+                partitions = [f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in new_years]
+                partitions.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+                cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION p_future INTO ({', '.join(partitions)})")
+            added[table] = new_years
+    logger.info("add_year_partitions through %s added %s", through_year, added)
+    return added
+
+
+def _live_totals(year):
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            '''SELECT COUNT(*) AS row_count, COALESCE(SUM(amount), 0) AS total
+               FROM expenses WHERE expense_date BETWEEN %s AND %s''',
+            (date(year, 1, 1), date(year, 12, 31))
+        )
+        return cursor.fetchall()[0]
+
+
+def _parquet_totals(path):
+    table = export.pq.read_table(path, columns=["amount"])
+    total = export.pc.sum(table.column("amount")).as_py()
+    return {"row_count": table.num_rows, "total": total or 0}
+
+
+def _write_archive(year, path):
+    tmp_path = path + ".tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        batches = db_helper.stream_expenses(date(year, 1, 1), date(year, 12, 31),
+                                            batch_size=config.EXPORT_BATCH_SIZE)
+        with open(tmp_path, "wb") as f:
+            for chunk in export.parquet_stream(batches):
+                f.write(chunk)
+        written, live = _parquet_totals(tmp_path), _live_totals(year)
+        if written["row_count"] != live["row_count"] or written["total"] != live["total"]:
+            raise RuntimeError(f"archive of {year} does not match MySQL: wrote {written}, expected {live}")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def _drop_live_rows(year):
+    # A year with its own partition is emptied instantly; older years share p_old.
+    with get_db_cursor(commit=True) as cursor:
+        if f"p{year}" in _partition_names(cursor, "expenses"):
+            cursor.execute(f"ALTER TABLE expenses TRUNCATE PARTITION p{year}")
+            return
+        while True:
+            cursor.execute(
+                "DELETE FROM expenses WHERE expense_date BETWEEN %s AND %s LIMIT %s",
+                (date(year, 1, 1), date(year, 12, 31), DELETE_CHUNK)
+            )
+            deleted = cursor.rowcount
+            cursor.execute("COMMIT")
+            if deleted < DELETE_CHUNK:
+                return
+
+
+def archive_year(year, archive_dir=None):
+    """Move the expenses of a closed year to a Parquet file and drop them from MySQL.
+
+    Claiming the year first waits for in-flight writes to it and rejects new ones
+    (db_helper.ensure_year_writable), so the file holds exactly the final rows. The daily
+    rollups of the year are kept, so analytics still cover it."""
+    if not is_closed(year):
+        raise ValueError(f"{year} is not closed yet (ARCHIVE_KEEP_YEARS={config.ARCHIVE_KEEP_YEARS})")
+    export._require_pyarrow()
+    path = archive_path(year, archive_dir)
+
+    try:
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute("INSERT INTO expense_archives (year) VALUES (%s)", (year,))
+    except mysql.connector.IntegrityError:
+        with get_db_cursor() as cursor:
+            cursor.execute("SELECT archived_at FROM expense_archives WHERE year = %s", (year,))
+            claimed = cursor.fetchall()
+        if not claimed or claimed[0]['archived_at'] is None:
+            raise RuntimeError(f"an archive of {year} is in progress or was interrupted; "
+                               f"delete its expense_archives row to retry")
+        # Archived before, but the live rows may not have been dropped.
+        _drop_live_rows(year)
+        return None
+
+    try:
+        written = _write_archive(year, path)
+    except BaseException:
+        with get_db_cursor(commit=True) as cursor:
+            cursor.execute("DELETE FROM expense_archives WHERE year = %s", (year,))
+        raise
+
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(
+            '''UPDATE expense_archives SET path = %s, row_count = %s, total = %s, archived_at = CURRENT_TIMESTAMP
+               WHERE year = %s''',
+            (path, written["row_count"], written["total"], year)
+        )
+    _drop_live_rows(year)
+    logger.info("archived %s: %s rows to %s", year, written["row_count"], path)
+    return {"year": year, "path": path, **written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive closed years to Parquet and manage year partitions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    archive_parser = subparsers.add_parser("archive", help="move the expenses of closed years to Parquet")
+    archive_parser.add_argument("years", type=int, nargs="+")
+    archive_parser.add_argument("--archive-dir")
+    subparsers.add_parser("status", help="list archived years")
+    partitions_parser = subparsers.add_parser("partitions", help="add yearly partitions")
+    partitions_parser.add_argument("--through", type=int, default=date.today().year + 1,
+                                   help="last year to have its own partition (default: next year)")
+    args = parser.parse_args(argv)
+
+    if args.command == "archive":
+        for year in sorted(args.years):
+            result = archive_year(year, args.archive_dir)
+            if result is None:
+                print(f"{year}: already archived, live rows dropped")
+            else:
+                print(f"{year}: {result['row_count']} rows, total {result['total']} -> {result['path']}")
+    elif args.command == "status":
+        for row in db_helper.fetch_archives():
+            print(f"{row['year']}: {row['row_count']} rows, total {row['total']}, "
+                  f"archived {row['archived_at']} -> {row['path']}")
+    else:
+        for table, years in add_year_partitions(args.through).items():
+            print(f"{table}: added {', '.join(map(str, years)) or 'nothing'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import asyncio
+import time
+import aiomysql
+from contextlib import asynccontextmanager
+from datetime import date
+import budgets
+import config
+import db_helper
+import db_router
+import export
+import metrics
+from logging_setup import setup_logger
+
+
+logger = setup_logger('async_db_helper')
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool():
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    host=config.DB_CONFIG["host"],
+                    port=config.DB_CONFIG["port"],
+                    user=config.DB_CONFIG["user"],
+                    password=config.DB_CONFIG["password"],
+                    db=config.DB_CONFIG["database"],
+                    minsize=config.DB_POOL_MIN_SIZE,
+                    maxsize=config.DB_POOL_MAX_SIZE,
+                    pool_recycle=int(config.DB_POOL_PING_INTERVAL),
+                    autocommit=False,
+                )
+                logger.info("async connection pool created with min=%s max=%s",
+                            config.DB_POOL_MIN_SIZE, config.DB_POOL_MAX_SIZE)
+    return _pool
+
+
+def get_pool_stats():
+    if _pool is None:
+        return {"size": 0, "in_use": 0, "idle": 0}
+    return {
+        "min_size": _pool.minsize,
+        "max_size": _pool.maxsize,
+        "size": _pool.size,
+        "idle": _pool.freesize,
+        "in_use": _pool.size - _pool.freesize,
+    }
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+async def _rollback(connection):
+    try:
+        await connection.rollback()
+    except Exception:
+        logger.exception("rollback failed, closing connection")
+        connection.close()
+
+
+@asynccontextmanager
+async def get_db_cursor(commit=False):
+    pool = await get_pool()
+    started = time.perf_counter()
+    connection = await asyncio.wait_for(pool.acquire(), config.DB_POOL_TIMEOUT)
+    metrics.DB_CONNECTION_ACQUIRE.observe(time.perf_counter() - started, "async")
+    try:
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            try:
+                yield cursor
+                if commit:
+                    await connection.commit()
+                    # This helper always uses the primary, but the sync reads that follow should too.
+                    db_router.note_write(config.DB_STICKY_SECONDS)
+                else:
+                    await _rollback(connection)
+            except BaseException:
+                await _rollback(connection)
+                raise
+    finally:
+        pool.release(connection)
+
+
+@metrics.track_query
+async def fetch_expenses_for_date(expense_date):
+    logger.debug("fetch_expenses_for_date called with %s", expense_date)
+    async with get_db_cursor() as cursor:
+        await cursor.execute(db_helper.EXPENSES_FOR_DATE_SQL, (expense_date,))
+        expenses = await cursor.fetchall()
+        if expenses:
+            return expenses
+        await cursor.execute(db_helper.ARCHIVE_PATH_SQL, (db_helper.expense_year(expense_date),))
+        archive = await cursor.fetchall()
+    if archive:
+        day = date.fromisoformat(str(expense_date))
+        # Parquet reads block; keep them off the event loop.
+        return await asyncio.to_thread(export.read_parquet_rows, archive[0]['path'], day, day)
+    return expenses
+
+
+async def refresh_daily_rollup(cursor, expense_date):
+    for sql, params in db_helper.rollup_refresh_statements(expense_date):
+        await cursor.execute(sql, params)
+
+
+async def refresh_search_index(cursor, expense_date):
+    for sql, params in db_helper.search_refresh_statements(expense_date):
+        await cursor.execute(sql, params)
+
+
+async def bump_data_version(cursor, expense_date):
+    await cursor.execute(db_helper.BUMP_GLOBAL_VERSION_SQL)
+    await cursor.execute(db_helper.GLOBAL_VERSION_SQL)
+    version = (await cursor.fetchall())[0]['version']
+    await cursor.execute(db_helper.SET_SCOPE_VERSIONS_SQL, db_helper.scope_version_params(expense_date, version))
+
+
+async def ensure_year_writable(cursor, expense_date):
+    year = db_helper.expense_year(expense_date)
+    await cursor.execute(db_helper.YEAR_LOCK_SQL, (year,))
+    db_helper.check_year_writable(year, await cursor.fetchall())
+
+
+async def day_totals(cursor, expense_date):
+    await cursor.execute(budgets.DAY_TOTALS_SQL, (expense_date,))
+    return {row['category']: row['total'] for row in await cursor.fetchall()}
+
+
+async def record_day_change(cursor, expense_date, before, after):
+    changes = budgets.day_changes(before, after)
+    if not changes:
+        return
+    for sql, params in budgets.lock_statements(changes):
+        await cursor.execute(sql, params)
+    for sql, params in budgets.update_statements(expense_date, changes, await cursor.fetchall()):
+        await cursor.execute(sql, params)
+
+
+async def record_date_write(cursor, expense_date):
+    await ensure_year_writable(cursor, expense_date)
+    before = await day_totals(cursor, expense_date)
+    await refresh_daily_rollup(cursor, expense_date)
+    await record_day_change(cursor, expense_date, before, await day_totals(cursor, expense_date))
+    await refresh_search_index(cursor, expense_date)
+    await bump_data_version(cursor, expense_date)
+
+
+@metrics.track_query
+async def fetch_data_versions(expense_date=None):
+    query, scopes = db_helper.data_versions_query(expense_date)
+    async with get_db_cursor() as cursor:
+        await cursor.execute(query, scopes)
+        return db_helper.data_versions(await cursor.fetchall(), scopes)
+
+
+@metrics.track_query
+async def fetch_span_versions(*spans):
+    query, params = db_helper.span_versions_query(spans)
+    async with get_db_cursor() as cursor:
+        await cursor.execute(query, params)
+        return db_helper.span_versions(await cursor.fetchall(), spans)
+
+
+@metrics.track_query
+async def replace_expenses_for_date(expense_date, expenses):
+    logger.info("replace_expenses_for_date called with %s, %s rows", expense_date, len(expenses))
+    rows = [(expense_date, e['amount'], e['category'], e['notes']) for e in expenses]
+    async with get_db_cursor(commit=True) as cursor:
+        await cursor.execute(db_helper.DELETE_DATE_SQL, (expense_date,))
+        if rows:
+            await cursor.executemany(db_helper.INSERT_EXPENSE_SQL, rows)
+        await record_date_write(cursor, expense_date)
+
+
+@metrics.track_query
+async def fetch_expense_summary(start_date, end_date):
+    logger.debug("fetch_expense_summary called with start: %s end: %s", start_date, end_date)
+    async with get_db_cursor() as cursor:
+        await cursor.execute(db_helper.EXPENSE_SUMMARY_SQL, (start_date, end_date))
+        return await cursor.fetchall()
+
+
+@metrics.track_query
+async def fetch_monthly_expense_summary():
+    logger.debug("fetch_expense_summary_by_months")
+    async with get_db_cursor() as cursor:
+        await cursor.execute(db_helper.MONTHLY_SUMMARY_SQL)
+        return await cursor.fetchall()
+
+
+@metrics.track_query
+async def fetch_bucketed_totals(start_date, end_date, bucket, by_category=False, category=None):
+    logger.debug("fetch_bucketed_totals called with start: %s end: %s bucket: %s",
+                 start_date, end_date, bucket)
+    query, params = db_helper.bucketed_totals_query(start_date, end_date, bucket, by_category, category)
+    async with get_db_cursor() as cursor:
+        await cursor.execute(query, params)
+        return await cursor.fetchall()
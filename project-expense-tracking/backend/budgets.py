@@ -0,0 +1,157 @@
+import math
+from datetime import date
+import config
+
+
+# Per-category running statistics of daily totals (Welford), month-to-date totals and
+# unusual-day alerts. They are updated from the day's rollup rows inside every write
+# transaction (db_helper.record_date_write), in time proportional to the categories the
+# write touched, so /budgets and /alerts never scan expenses.
+
+# Locking read: writers of the same date are serialized here, and each sees the totals
+# the previous one committed.
+DAY_TOTALS_SQL = "SELECT category, total FROM expense_daily_rollup WHERE expense_date = %s FOR UPDATE"
+# Creating missing rows first means every category is then locked by row, in a fixed order.
+ENSURE_STATS_SQL = '''INSERT INTO category_stats (category) VALUES (%s)
+                      ON DUPLICATE KEY UPDATE day_count = day_count'''
+LOCK_STATS_SQL = "SELECT category, day_count, mean, m2 FROM category_stats WHERE category IN ({}) FOR UPDATE"
+UPDATE_STATS_SQL = "UPDATE category_stats SET day_count = %s, mean = %s, m2 = %s WHERE category = %s"
+ADD_MONTH_TOTAL_SQL = '''INSERT INTO category_month_totals (month, category, total) VALUES (%s, %s, %s) AS delta
+                         ON DUPLICATE KEY UPDATE total = category_month_totals.total + delta.total'''
+SAVE_ALERT_SQL = '''REPLACE INTO spending_alerts (expense_date, category, total, mean, std_dev, z_score)
+                    VALUES (%s, %s, %s, %s, %s, %s)'''
+DELETE_ALERT_SQL = "DELETE FROM spending_alerts WHERE expense_date = %s AND category = %s"
+
+REBUILD_SQL = [
+    "DELETE FROM category_stats",
+    '''INSERT INTO category_stats (category, day_count, mean, m2)
+       SELECT category, COUNT(*), AVG(total), VAR_POP(total) * COUNT(*)
+       FROM expense_daily_rollup GROUP BY category''',
+    "DELETE FROM category_month_totals",
+    '''INSERT INTO category_month_totals (month, category, total)
+       SELECT expense_date - INTERVAL (DAY(expense_date) - 1) DAY AS month, category, SUM(total)
+       FROM expense_daily_rollup GROUP BY month, category''',
+]
+
+
+def welford_add(stats, x):
+    count, mean, m2 = stats
+    count += 1
+    delta = x - mean
+    mean += delta / count
+    return count, mean, m2 + delta * (x - mean)
+
+
+def welford_remove(stats, x):
+    count, mean, m2 = stats
+    if count <= 1:
+        return 0, 0.0, 0.0
+    new_mean = (count * mean - x) / (count - 1)
+    # Guard against a slightly negative M2 from rounding.
+    return count - 1, new_mean, max(0.0, m2 - (x - mean) * (x - new_mean))
+
+
+def stddev(stats):
+    count, _, m2 = stats
+    return math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+
+
+def month_of(expense_date):
+    day = date.fromisoformat(str(expense_date))
+    return day.replace(day=1)
+
+
+def day_changes(before, after):
+    """{category: (old_total, new_total)} for the categories whose total on the day changed;
+    a missing total is None."""
+    changes = {}
+    for category in sorted(set(before) | set(after)):
+        old, new = before.get(category), after.get(category)
+        if old != new:
+            changes[category] = (old, new)
+    return changes
+
+
+def apply_change(stats, old, new):
+    """Replace a day's total ``old`` by ``new`` in a category's (count, mean, m2). Returns
+    the new stats and, when ``new`` is unusually high against the other days, its z-score."""
+    if old is not None:
+        stats = welford_remove(stats, float(old))
+    z_score = None
+    # The day is judged against the category's other days, before it is added.
+    if new is not None and stats[0] >= config.ALERT_MIN_DAYS:
+        deviation = stddev(stats)
+        if deviation > 0 and (float(new) - stats[1]) / deviation >= config.ALERT_Z_SCORE:
+            z_score = (float(new) - stats[1]) / deviation
+    baseline = stats
+    if new is not None:
+        stats = welford_add(stats, float(new))
+    return stats, baseline, z_score
+
+
+def day_totals(cursor, expense_date):
+    cursor.execute(DAY_TOTALS_SQL, (expense_date,))
+    return {row['category']: row['total'] for row in cursor.fetchall()}
+
+
+def lock_statements(changes):
+    """Statements that create and lock the stats rows of the changed categories, in
+    category order; the last one selects them."""
+    statements = [(ENSURE_STATS_SQL, (category,)) for category in changes]
+    statements.append((LOCK_STATS_SQL.format(", ".join(["%s"] * len(changes))), tuple(changes)))
+    return statements
+
+
+def update_statements(expense_date, changes, stats_rows):
+    """Statements folding ``changes`` (from day_changes) into the locked ``stats_rows``,
+    the month totals and the alerts."""
+    month = month_of(expense_date)
+    stats_by_category = {row['category']: (row['day_count'], row['mean'], row['m2']) for row in stats_rows}
+    statements = []
+    for category, (old, new) in changes.items():
+        stats, baseline, z_score = apply_change(stats_by_category[category], old, new)
+        statements.append((UPDATE_STATS_SQL, (*stats, category)))
+        statements.append((ADD_MONTH_TOTAL_SQL, (month, category, (new or 0) - (old or 0))))
+        if z_score is None:
+            statements.append((DELETE_ALERT_SQL, (expense_date, category)))
+        else:
+            statements.append((SAVE_ALERT_SQL, (expense_date, category, new, baseline[1], stddev(baseline), z_score)))
+    return statements
+
+
+def record_day_change(cursor, expense_date, before, after):
+    """Fold the change of one day's per-category totals into the statistics, month totals
+    and alerts, inside the caller's transaction."""
+    changes = day_changes(before, after)
+    if not changes:
+        return
+    for sql, params in lock_statements(changes):
+        cursor.execute(sql, params)
+    for sql, params in update_statements(expense_date, changes, cursor.fetchall()):
+        cursor.execute(sql, params)
+
+
+def summarize(budgets, month_totals, stats):
+    """Budget status per category for one month, from ``{category: monthly_limit}``,
+    ``{category: spent}`` and ``{category: (count, mean, m2)}``."""
+    summary = []
+    for category in sorted(set(budgets) | set(month_totals)):
+        limit, spent = budgets.get(category), month_totals.get(category, 0)
+        count, mean, _ = stats.get(category, (0, 0.0, 0.0))
+        summary.append({
+            "category": category,
+            "monthly_limit": limit,
+            "spent": spent,
+            "remaining": None if limit is None else limit - spent,
+            "over_budget": limit is not None and spent > limit,
+            "daily_mean": mean,
+            "daily_stddev": stddev(stats.get(category, (0, 0.0, 0.0))),
+            "days": count,
+        })
+    return summary
+
+
+def rebuild_stats(cursor):
+    # Recompute statistics and month totals from the rollups (alerts are kept).
+    for statement in REBUILD_SQL:
+        cursor.execute(statement)
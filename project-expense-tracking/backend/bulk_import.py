@@ -0,0 +1,184 @@
+import argparse
+import codecs
+import csv
+import json
+import os
+import sys
+from datetime import date
+from decimal import Decimal, InvalidOperation
+import db_helper
+
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 5000
+# A batch is buffered in memory and written in one transaction.
+MAX_BATCH_SIZE = 50000
+# Only the first rejects are kept in the report so memory stays flat on very dirty files.
+MAX_REPORTED_REJECTS = 1000
+MAX_AMOUNT = Decimal("9999999999.99")
+
+
+def iter_lines(chunks, encoding="utf-8"):
+    """Turn an iterable of byte chunks into text lines without reading it all."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_records(lines, fmt):
+    """Yield ``(line_number, record)`` pairs, or ``(line_number, error)`` for unparseable lines."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ValueError("expected a JSON object")
+                continue
+            yield line_number, record
+    else:
+        raise ValueError(f"unsupported format {fmt!r}, expected one of {FORMATS}")
+
+
+def validate_record(record, closed_years=()):
+    try:
+        expense_date = date.fromisoformat(str(record.get("expense_date") or "").strip())
+    except ValueError:
+        raise ValueError(f"invalid expense_date {record.get('expense_date')!r}")
+    if expense_date.year in closed_years:
+        raise ValueError(f"expenses of {expense_date.year} are archived and read-only")
+
+    try:
+        amount = Decimal(str(record.get("amount")).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"invalid amount {record.get('amount')!r}")
+    if not amount.is_finite() or amount.as_tuple().exponent < -2 or abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"amount {record.get('amount')!r} is not a DECIMAL(12,2) value")
+
+    category = str(record.get("category") or "").strip()
+    if not category or len(category) > 255:
+        raise ValueError("category must be 1-255 characters")
+
+    notes = record.get("notes")
+    return expense_date, amount, category, "" if notes is None else str(notes)
+
+
+def import_records(records, batch_size=DEFAULT_BATCH_SIZE, write_batch=None, progress=None, closed_years=None):
+    """Validate ``(line_number, record)`` pairs batch by batch and write each valid
+    batch in its own transaction. Returns a report of counts and rejected rows.
+    Rows dated in ``closed_years`` (default: the archived years) are rejected. If a
+    year is archived during the import, the batch that hits it is rolled back, the
+    import stops, and ``failed_batch`` says where: earlier batches stay committed."""
+    write_batch = write_batch or db_helper.insert_expenses_batch
+    if closed_years is None:
+        closed_years = db_helper.fetch_closed_years()
+    report = {"rows_read": 0, "rows_imported": 0, "rows_rejected": 0, "batches": 0, "rejects": [],
+              "failed_batch": None}
+    batch = []
+    first_line = None
+
+    def flush():
+        nonlocal batch
+        if not batch:
+            return True
+        try:
+            write_batch(batch)
+        except db_helper.ArchivedYearError as e:
+            report["failed_batch"] = {"batch": report["batches"] + 1, "first_line": first_line,
+                                      "rows": len(batch), "error": str(e)}
+            return False
+        report["rows_imported"] += len(batch)
+        report["batches"] += 1
+        batch = []
+        if progress:
+            progress(report)
+        return True
+
+    for line_number, record in records:
+        report["rows_read"] += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            row = validate_record(record, closed_years)
+        except ValueError as e:
+            report["rows_rejected"] += 1
+            if len(report["rejects"]) < MAX_REPORTED_REJECTS:
+                report["rejects"].append({"line": line_number, "error": str(e)})
+            continue
+        if not batch:
+            first_line = line_number
+        batch.append(row)
+        if len(batch) >= batch_size and not flush():
+            break
+    else:
+        flush()
+
+    report["rejects_truncated"] = report["rows_rejected"] > len(report["rejects"])
+    if report["failed_batch"]:
+        db_helper.logger.warning("import stopped at batch %s: %s imported, %s rejected: %s",
+                                 report['failed_batch']['batch'], report['rows_imported'],
+                                 report['rows_rejected'], report['failed_batch']['error'])
+    else:
+        db_helper.logger.info("import finished: %s imported, %s rejected",
+                              report['rows_imported'], report['rows_rejected'])
+    return report
+
+
+def import_chunks(chunks, fmt, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    return import_records(parse_records(iter_lines(chunks), fmt), batch_size, progress=progress)
+
+
+def _batch_size(value):
+    size = int(value)
+    if not 1 <= size <= MAX_BATCH_SIZE:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_BATCH_SIZE}")
+    return size
+
+
+def _read_chunks(path, chunk_size=1 << 20):
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import expenses from a CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="file format (defaults to the file extension)")
+    parser.add_argument("--batch-size", type=_batch_size, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        parser.error(f"cannot infer format from {args.path!r}, pass --format")
+
+    def progress(report):
+        print(f"batch {report['batches']}: {report['rows_imported']} imported, "
+              f"{report['rows_rejected']} rejected", file=sys.stderr)
+
+    report = import_chunks(_read_chunks(args.path), fmt, args.batch_size, progress)
+    for reject in report["rejects"]:
+        print(f"line {reject['line']}: {reject['error']}")
+    print(json.dumps({k: v for k, v in report.items() if k != "rejects"}))
+    return 1 if report["failed_batch"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
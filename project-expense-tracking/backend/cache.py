@@ -0,0 +1,151 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class LRUBackend:
+    """In-process store bounded by entry count and per-entry TTL."""
+
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Store shared by all worker processes. Size is bounded by the server's maxmemory policy."""
+
+    def __init__(self, url, ttl=300.0, prefix="expense_cache:"):
+        if redis is None:
+            raise RuntimeError("CACHE_REDIS_URL is set but the 'redis' package is not installed")
+        self.ttl = ttl
+        self.prefix = prefix
+        self.evictions = 0
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        return None if value is None else pickle.loads(value)
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(self.ttl)))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def keys(self):
+        return [key.decode()[len(self.prefix):] for key in self._client.scan_iter(match=self.prefix + "*")]
+
+    def __len__(self):
+        return len(self.keys())
+
+
+class ResultCache:
+    """Endpoint results keyed by endpoint name and the date range they cover.
+
+    Keys look like ``analytics|2024-08-01|2024-08-31``; an empty range means the
+    result depends on every date (e.g. the monthly summary). ``invalidate_date``
+    drops only the entries whose range contains the written date.
+
+    Entries are stored with the data version of their range at the time they were
+    computed (see db_helper.span_versions); a lookup with a different version is a miss.
+    That catches writes made by other workers, or not yet invalidated here, while writes
+    outside the range leave the entry valid.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bumped on every invalidation so a result computed before a write is not stored after it.
+        self.generation = 0
+
+    @staticmethod
+    def make_key(endpoint, start_date=None, end_date=None, *params):
+        parts = [endpoint, start_date.isoformat() if start_date else "", end_date.isoformat() if end_date else ""]
+        return "|".join(parts + [str(param) for param in params])
+
+    def get(self, key, version=None):
+        entry = self.backend.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, generation=None, version=None):
+        if generation is not None and generation != self.generation:
+            return
+        self.backend.set(key, (version, value))
+
+    def invalidate_date(self, expense_date):
+        day = expense_date.isoformat()
+        self.generation += 1
+        for key in self.backend.keys():
+            _, start, end = key.split("|")[:3]
+            if (not start or start <= day) and (not end or day <= end):
+                self.backend.delete(key)
+                self.invalidations += 1
+
+    def clear(self):
+        self.generation += 1
+        for key in self.backend.keys():
+            self.backend.delete(key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def create_cache(max_entries, ttl, redis_url=None):
+    if redis_url:
+        return ResultCache(RedisBackend(redis_url, ttl=ttl))
+    return ResultCache(LRUBackend(max_entries=max_entries, ttl=ttl))
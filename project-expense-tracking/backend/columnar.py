@@ -0,0 +1,215 @@
+import argparse
+import calendar
+import json
+import sys
+import threading
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+import db_helper
+from logging_setup import setup_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+logger = setup_logger('columnar')
+
+# Same names (and result shapes) as the db_helper functions the snapshot can answer,
+# so server.call_db can route to either.
+QUERIES = ("fetch_expense_summary", "fetch_monthly_expense_summary", "fetch_bucketed_totals")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# One entry per expense_daily_rollup row, sorted by (ordinal, category code). months
+# (since January 1970) is derived from ordinals once, for the month-based buckets.
+_Columns = namedtuple("_Columns", "ordinals codes cents counts months")
+
+
+def _cents(total):
+    return int(Decimal(total).scaleb(2))
+
+
+def _decimal(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class ColumnarSnapshot:
+    """In-memory copy of expense_daily_rollup held as NumPy columns (date ordinals,
+    category codes, cents and counts) answering the aggregate queries with vectorized
+    operations. Updates build new arrays and swap them in, so readers never lock."""
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("the columnar snapshot requires the 'numpy' package")
+        self.version = None
+        self.stale = True
+        self.categories = []
+        self._codes = {}
+        self._lock = threading.Lock()
+        self._columns = self._build([])
+
+    def _code(self, category):
+        code = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def _build(self, rows):
+        rows = sorted((date.fromisoformat(str(row['expense_date'])).toordinal(), self._code(row['category']),
+                       _cents(row['total']), int(row['expense_count'])) for row in rows)
+        ordinals, codes, cents, counts = zip(*rows) if rows else ((), (), (), ())
+        ordinals = np.array(ordinals, dtype=np.int32)
+        months = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        return _Columns(ordinals, np.array(codes, dtype=np.int32), np.array(cents, dtype=np.int64),
+                        np.array(counts, dtype=np.int64), months)
+
+    def load(self, rows, version):
+        with self._lock:
+            self._columns = self._build(rows)
+            self.version, self.stale = version, False
+        logger.info("columnar snapshot loaded: %s rows at version %s", len(self._columns.ordinals), version)
+
+    def replace_date(self, expense_date, rows, version):
+        # Swap in the rollup rows of one date; the other dates' arrays are copied unchanged.
+        ordinal = date.fromisoformat(str(expense_date)).toordinal()
+        with self._lock:
+            current, new = self._columns, self._build(rows)
+            first = np.searchsorted(current.ordinals, ordinal, side="left")
+            last = np.searchsorted(current.ordinals, ordinal, side="right")
+            self._columns = _Columns(*(np.concatenate([old[:first], added, old[last:]])
+                                       for old, added in zip(current, new)))
+            self.version = version
+
+    def observe(self, version):
+        # Called with a global data version read by a request; a newer one means a write this
+        # snapshot has not seen (e.g. from another worker) and needs a reload. An older one
+        # comes from a lagging replica and says nothing about the snapshot.
+        if self.version is None or version > self.version:
+            self.stale = True
+        return self.stale
+
+    def serves(self, name):
+        return not self.stale and name in QUERIES
+
+    def _range(self, start_date, end_date):
+        columns = self._columns
+        first = np.searchsorted(columns.ordinals, date.fromisoformat(str(start_date)).toordinal(), side="left")
+        last = np.searchsorted(columns.ordinals, date.fromisoformat(str(end_date)).toordinal(), side="right")
+        return _Columns(*(column[first:last] for column in columns))
+
+    def _group(self, keys, columns):
+        unique, inverse = np.unique(keys, return_inverse=True)
+        cents = np.bincount(inverse, weights=columns.cents, minlength=len(unique))
+        counts = np.bincount(inverse, weights=columns.counts, minlength=len(unique))
+        return unique, np.rint(cents).astype(np.int64), counts.astype(np.int64)
+
+    def fetch_expense_summary(self, start_date, end_date):
+        columns = self._range(start_date, end_date)
+        codes, cents, _ = self._group(columns.codes, columns)
+        return [{"category": self.categories[code], "total": _decimal(total)} for code, total in zip(codes, cents)]
+
+    def fetch_monthly_expense_summary(self):
+        columns = self._columns
+        keys, cents, _ = self._group(columns.months % 12 + 1, columns)
+        return [{"expense_month": int(month), "month_name": calendar.month_name[month], "total": _decimal(total)}
+                for month, total in zip(keys, cents)]
+
+    @staticmethod
+    def _bucket_keys(columns, bucket):
+        if bucket == "day":
+            return columns.ordinals.astype(np.int64)
+        if bucket == "week":
+            # Ordinal 1 (January 1st of year 1) is a Monday.
+            return (columns.ordinals - (columns.ordinals - 1) % 7).astype(np.int64)
+        return columns.months - columns.months % {"month": 1, "quarter": 3, "year": 12}[bucket]
+
+    @staticmethod
+    def _bucket_date(key, bucket):
+        if bucket in ("day", "week"):
+            return date.fromordinal(int(key))
+        return date(1970 + int(key) // 12, int(key) % 12 + 1, 1)
+
+    def fetch_bucketed_totals(self, start_date, end_date, bucket, by_category=False, category=None):
+        columns = self._range(start_date, end_date)
+        if category:
+            code = self._codes.get(category)
+            columns = _Columns(*(column[columns.codes == code] for column in columns))
+        keys = self._bucket_keys(columns, bucket)
+        if not by_category:
+            buckets, cents, counts = self._group(keys, columns)
+            return [{"bucket": self._bucket_date(key, bucket), "total": _decimal(total), "expense_count": int(count)}
+                    for key, total, count in zip(buckets, cents, counts)]
+
+        width = max(len(self.categories), 1)
+        combined, cents, counts = self._group(keys * width + columns.codes, columns)
+        rows = [{"bucket": self._bucket_date(key // width, bucket), "category": self.categories[key % width],
+                 "total": _decimal(total), "expense_count": int(count)}
+                for key, total, count in zip(combined, cents, counts)]
+        return sorted(rows, key=lambda row: (row["bucket"], row["category"]))
+
+
+def load_from_db(snapshot):
+    version, rows = db_helper.fetch_rollup_snapshot()
+    snapshot.load(rows, version)
+
+
+def refresh_date(snapshot, expense_date):
+    # Incremental update after a write to one date by this process. If anything else was
+    # written in between, the snapshot is marked stale and reloaded instead.
+    try:
+        version, rows = db_helper.fetch_rollup_snapshot(expense_date)
+    except Exception:
+        logger.exception("refreshing %s in the columnar snapshot failed", expense_date)
+        snapshot.stale = True
+        return
+    if version == snapshot.version:
+        return
+    if snapshot.version is not None and version == snapshot.version + 1:
+        snapshot.replace_date(expense_date, rows, version)
+    else:
+        snapshot.stale = True
+
+
+def _normalize(rows):
+    return sorted(json.dumps({key: str(value) for key, value in row.items()}, sort_keys=True) for row in rows)
+
+
+def compare_with_sql(snapshot, start_date, end_date):
+    """Run each aggregate through the snapshot and through MySQL and return the
+    queries whose results differ."""
+    checks = [("fetch_expense_summary", (start_date, end_date)), ("fetch_monthly_expense_summary", ())]
+    for bucket in ("day", "week", "month", "quarter", "year"):
+        checks.append(("fetch_bucketed_totals", (start_date, end_date, bucket)))
+        checks.append(("fetch_bucketed_totals", (start_date, end_date, bucket, True)))
+    mismatches = []
+    for name, args in checks:
+        expected, actual = getattr(db_helper, name)(*args), getattr(snapshot, name)(*args)
+        if _normalize(expected) != _normalize(actual):
+            mismatches.append({"query": name, "args": [str(arg) for arg in args],
+                               "sql_rows": len(expected), "columnar_rows": len(actual)})
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the columnar snapshot against MySQL.")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(1970, 1, 1))
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2099, 12, 31))
+    args = parser.parse_args(argv)
+    if np is None:
+        parser.error("the columnar snapshot requires numpy")
+
+    snapshot = ColumnarSnapshot()
+    load_from_db(snapshot)
+    mismatches = compare_with_sql(snapshot, args.start_date, args.end_date)
+    for mismatch in mismatches:
+        print(json.dumps(mismatch))
+    print(f"{len(mismatches)} mismatched queries")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import os
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def _env_levels(name):
+    # "db_helper=DEBUG,cache=WARNING" -> {"db_helper": "DEBUG", "cache": "WARNING"}
+    levels = {}
+    for item in os.getenv(name, "").split(","):
+        if "=" in item:
+            module, level = item.split("=", 1)
+            levels[module.strip()] = level.strip().upper()
+    return levels
+
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": _env_int("DB_PORT", 3306),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "@6704Susmit"),
+    "database": os.getenv("DB_NAME", "expense_manager"),
+}
+
+# Connection pool sizing. Each uvicorn worker process owns its own pool, so the
+# server sees up to workers * DB_POOL_MAX_SIZE connections.
+DB_POOL_MIN_SIZE = _env_int("DB_POOL_MIN_SIZE", 2)
+DB_POOL_MAX_SIZE = _env_int("DB_POOL_MAX_SIZE", 10)
+DB_POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 5.0)
+# Idle connections older than this (seconds) are pinged before being handed out.
+DB_POOL_PING_INTERVAL = _env_float("DB_POOL_PING_INTERVAL", 30.0)
+
+# Read replicas as "host[:port],host[:port]" (same user, password and database as the
+# primary). Reads made while serving a request go to a replica that is reachable and at
+# most DB_REPLICA_MAX_LAG seconds behind; writes, and reads of a client for
+# DB_STICKY_SECONDS after its last write, go to the primary.
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+DB_REPLICA_MAX_LAG = _env_float("DB_REPLICA_MAX_LAG", 5.0)
+DB_REPLICA_CHECK_INTERVAL = _env_float("DB_REPLICA_CHECK_INTERVAL", 5.0)
+DB_STICKY_SECONDS = _env_float("DB_STICKY_SECONDS", 10.0)
+
+# Apply pending schema migrations (backend/migrations) when the server starts.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+
+# Serve the endpoints through the aiomysql-based async_db_helper instead of running
+# the blocking db_helper on Starlette's threadpool.
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+# Server-side cache for /analytics/ and /monthly_summary/ results. Writes invalidate
+# the entries covering the written date. With several workers, point CACHE_REDIS_URL
+# at a shared Redis so an invalidation in one worker is seen by all of them.
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL = _env_float("CACHE_TTL", 300.0)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+
+# Answer the aggregate queries from an in-memory NumPy copy of the daily rollups
+# (columnar.py) instead of MySQL. Requires numpy.
+COLUMNAR_ENABLED = os.getenv("COLUMNAR_ENABLED", "0") == "1"
+
+# A category's daily total is reported by GET /alerts when it is at least ALERT_Z_SCORE
+# standard deviations above the category's mean over its other days with spending, once
+# there are ALERT_MIN_DAYS of them.
+ALERT_Z_SCORE = _env_float("ALERT_Z_SCORE", 3.0)
+ALERT_MIN_DAYS = _env_int("ALERT_MIN_DAYS", 14)
+
+# Rows fetched from the server per round trip (and per Parquet row group) by GET /export.
+EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 10000)
+
+# Closed years are moved to Parquet files here by `python archive.py archive YEAR`.
+# The current year and the ARCHIVE_KEEP_YEARS - 1 before it stay in MySQL.
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_KEEP_YEARS = _env_int("ARCHIVE_KEEP_YEARS", 2)
+
+# Page size for GET /expenses (keyset paginated).
+PAGE_SIZE_DEFAULT = _env_int("PAGE_SIZE_DEFAULT", 100)
+PAGE_SIZE_MAX = _env_int("PAGE_SIZE_MAX", 1000)
+
+# Largest number of buckets a single /timeseries request may return.
+MAX_BUCKETS = _env_int("MAX_BUCKETS", 5000)
+
+# Logging. Records are queued and written by a background thread; see logging_setup.
+LOG_FILE = os.getenv("LOG_FILE", "server.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = _env_levels("LOG_LEVELS")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# "size" rotates at LOG_MAX_BYTES, "time" at LOG_ROTATE_WHEN (a TimedRotatingFileHandler interval).
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size")
+LOG_MAX_BYTES = _env_int("LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUP_COUNT = _env_int("LOG_BACKUP_COUNT", 5)
+# Give each process its own file (server.<pid>.log). Set it when running several uvicorn
+# workers: they each open LOG_FILE, and rotating one file from several processes loses or
+# truncates records. Old per-pid files are not removed automatically.
+LOG_PER_PROCESS = os.getenv("LOG_PER_PROCESS", "0") == "1"
+
+# db_helper calls slower than this many milliseconds are logged to the slow_query logger (0 disables).
+SLOW_QUERY_MS = _env_float("SLOW_QUERY_MS", 200.0)
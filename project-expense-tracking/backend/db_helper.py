@@ -1,79 +1,791 @@
+import threading
+import time
 import mysql.connector
 from contextlib import contextmanager
+from datetime import date
+import budgets
+import config
+import db_router
+import export
+import metrics
+from db_pool import ConnectionPool
 from logging_setup import setup_logger
+from timeseries import BUCKET_SQL
 
 
 logger = setup_logger('db_helper')
 
+_pool = None
+_router = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    lambda: mysql.connector.connect(**config.DB_CONFIG),
+                    min_size=config.DB_POOL_MIN_SIZE,
+                    max_size=config.DB_POOL_MAX_SIZE,
+                    timeout=config.DB_POOL_TIMEOUT,
+                    ping_interval=config.DB_POOL_PING_INTERVAL,
+                )
+                logger.info("connection pool created with min=%s max=%s",
+                            config.DB_POOL_MIN_SIZE, config.DB_POOL_MAX_SIZE)
+    return _pool
+
+
+def _connect_replica(host, port):
+    connection = mysql.connector.connect(**{**config.DB_CONFIG, "host": host, "port": port})
+    cursor = connection.cursor()
+    # A read routed here by mistake must fail instead of diverging from the primary.
+    cursor.execute("SET SESSION TRANSACTION READ ONLY")
+    cursor.close()
+    return connection
+
+
+def replica_lag(connection):
+    # Seconds_Behind_Source is NULL while replication is stopped; an instance that is not
+    # replicating at all (e.g. a second local server used for testing) counts as current.
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SHOW REPLICA STATUS")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if not rows:
+        return 0.0
+    lag = rows[0].get('Seconds_Behind_Source')
+    return None if lag is None else float(lag)
+
+
+def _parse_host(host):
+    name, _, port = host.partition(":")
+    return name, int(port) if port else 3306
+
+
+def get_router():
+    global _router
+    if _router is None and config.DB_REPLICA_HOSTS:
+        with _pool_lock:
+            if _router is None:
+                replicas = []
+                for host in config.DB_REPLICA_HOSTS:
+                    name, port = _parse_host(host)
+                    # min_size=0: a replica that is down must not keep the server from starting.
+                    pool = ConnectionPool(
+                        lambda name=name, port=port: _connect_replica(name, port),
+                        min_size=0,
+                        max_size=config.DB_POOL_MAX_SIZE,
+                        timeout=config.DB_POOL_TIMEOUT,
+                        ping_interval=config.DB_POOL_PING_INTERVAL,
+                    )
+                    replicas.append(db_router.Replica(host, pool))
+                _router = db_router.ReplicaRouter(
+                    replicas, replica_lag,
+                    max_lag=config.DB_REPLICA_MAX_LAG,
+                    check_interval=config.DB_REPLICA_CHECK_INTERVAL,
+                    logger=logger,
+                )
+                logger.info("routing reads to replicas %s", ", ".join(config.DB_REPLICA_HOSTS))
+    return _router
+
+
+def get_pool_stats():
+    if _pool is None:
+        stats = {"size": 0, "in_use": 0, "idle": 0, "waiters": 0}
+    else:
+        stats = _pool.stats()
+    if _router is not None:
+        stats["replicas"] = _router.stats()
+    return stats
+
+
+def close_pool():
+    global _pool, _router
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        if _router is not None:
+            for replica in _router.replicas:
+                replica.pool.close()
+            _router = None
+
+
+def _rollback(connection):
+    try:
+        connection.rollback()
+        return True
+    except Exception:
+        logger.exception("rollback failed, discarding connection")
+        return False
+
+
+def _acquire(commit):
+    # Reads inside a request go to the request's replica unless the client wrote recently;
+    # a replica that cannot hand out a connection is skipped until its next health check.
+    router = None if commit else get_router()
+    if router is not None and db_router.replica_reads_allowed():
+        replica = db_router.request_replica(router)
+        if replica is not None:
+            try:
+                return replica.pool, replica.pool.acquire(), replica
+            except Exception as e:
+                router.mark_unhealthy(replica, e)
+    pool = get_pool()
+    return pool, pool.acquire(), None
+
 
 @contextmanager
 def get_db_cursor(commit=False):
-    connection = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="@6704Susmit",
-        database="expense_manager"
-    )
+    started = time.perf_counter()
+    pool, connection, replica = _acquire(commit)
+    metrics.DB_CONNECTION_ACQUIRE.observe(time.perf_counter() - started, "sync")
+    discard = False
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        yield cursor
+        if commit:
+            connection.commit()
+            db_router.note_write(config.DB_STICKY_SECONDS)
+        else:
+            # End the implicit read transaction so the next borrower does not see a stale snapshot.
+            discard = not _rollback(connection)
+    except Exception as e:
+        discard = not _rollback(connection)
+        if replica is not None and isinstance(e, (mysql.connector.InterfaceError,
+                                                  mysql.connector.OperationalError)):
+            get_router().mark_unhealthy(replica, e)
+        raise
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                discard = True
+        pool.release(connection, discard=discard)
+
+
+# SQL shared with async_db_helper, which executes the same statements on aiomysql.
+EXPENSES_FOR_DATE_SQL = "SELECT * FROM expenses WHERE expense_date = %s"
+ARCHIVE_PATH_SQL = "SELECT path FROM expense_archives WHERE year = %s AND archived_at IS NOT NULL"
+DELETE_DATE_SQL = "DELETE FROM expenses WHERE expense_date = %s"
+INSERT_EXPENSE_SQL = "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (%s, %s, %s, %s)"
+YEAR_LOCK_SQL = "SELECT year FROM expense_archives WHERE year = %s FOR SHARE"
+EXPENSE_SUMMARY_SQL = '''SELECT category, SUM(total) as total
+                         FROM expense_daily_rollup WHERE expense_date
+                         BETWEEN %s and %s
+                         GROUP BY category'''
+MONTHLY_SUMMARY_SQL = '''SELECT month(expense_date) as expense_month,
+                         monthname(expense_date) as month_name,
+                         sum(total) as total FROM expense_daily_rollup
+                         GROUP BY expense_month, month_name'''
+
+
+def rollup_refresh_statements(expense_date):
+    # Recompute the rollup rows of one date inside the caller's write transaction.
+    return [
+        ("DELETE FROM expense_daily_rollup WHERE expense_date = %s", (expense_date,)),
+        ('''INSERT INTO expense_daily_rollup (expense_date, category, total, expense_count)
+            SELECT expense_date, category, SUM(amount), COUNT(*)
+            FROM expenses WHERE expense_date = %s
+            GROUP BY expense_date, category''', (expense_date,)),
+    ]
+
+
+def search_refresh_statements(expense_date):
+    # Sync expense_search with the date's rows. Upserting (rather than replacing) leaves
+    # unchanged rows alone, so the FULLTEXT index only sees notes that actually changed.
+    return [
+        ('''DELETE s FROM expense_search s
+            LEFT JOIN expenses e ON e.id = s.expense_id AND e.expense_date = s.expense_date
+            WHERE s.expense_date = %s AND e.id IS NULL''', (expense_date,)),
+        ('''INSERT INTO expense_search (expense_id, expense_date, amount, category, notes)
+            SELECT * FROM (SELECT id, expense_date, amount, category, notes
+                           FROM expenses WHERE expense_date = %s) AS e
+            ON DUPLICATE KEY UPDATE amount = e.amount, category = e.category, notes = e.notes''',
+         (expense_date,)),
+    ]
+
+
+def refresh_daily_rollup(cursor, expense_date):
+    for sql, params in rollup_refresh_statements(expense_date):
+        cursor.execute(sql, params)
+
+
+def refresh_search_index(cursor, expense_date):
+    for sql, params in search_refresh_statements(expense_date):
+        cursor.execute(sql, params)
+
+
+# Data versions: 'global' counts write steps (one per written date), and the written date
+# ('YYYY-MM-DD') and its month ('YYYY-MM') are set to the new global value. The version of
+# a date range is then the largest month version in it, which changes on every write to
+# the range and on no other write.
+BUMP_GLOBAL_VERSION_SQL = '''INSERT INTO data_versions (scope, version) VALUES ('global', 1)
+                             ON DUPLICATE KEY UPDATE version = version + 1'''
+GLOBAL_VERSION_SQL = "SELECT version FROM data_versions WHERE scope = 'global'"
+SET_SCOPE_VERSIONS_SQL = '''INSERT INTO data_versions (scope, version) VALUES (%s, %s), (%s, %s) AS new
+                            ON DUPLICATE KEY UPDATE version = new.version'''
+
+
+def month_scope(expense_date):
+    return str(expense_date)[:7]
+
+
+def scope_version_params(expense_date, version):
+    return (str(expense_date), version, month_scope(expense_date), version)
 
-    cursor = connection.cursor(dictionary=True)
-    yield cursor
-    if commit:
-        connection.commit()
-    cursor.close()
-    connection.close()
 
+def data_versions_query(expense_date=None):
+    scopes = ['global'] if expense_date is None else ['global', str(expense_date)]
+    return f"SELECT scope, version FROM data_versions WHERE scope IN ({', '.join(['%s'] * len(scopes))})", scopes
 
+
+def data_versions(rows, scopes):
+    versions = {row['scope']: row['version'] for row in rows}
+    return {scope: versions.get(scope, 0) for scope in scopes}
+
+
+def span_versions_query(spans):
+    """Query for the global version and the month versions covering ``spans``, a list of
+    (start_date, end_date) pairs; an open pair stands for all data."""
+    conditions, params = ["scope = 'global'"], []
+    for start_date, end_date in spans:
+        if start_date and end_date:
+            conditions.append("(CHAR_LENGTH(scope) = 7 AND scope BETWEEN %s AND %s)")
+            params.extend([month_scope(start_date), month_scope(end_date)])
+    return f"SELECT scope, version FROM data_versions WHERE {' OR '.join(conditions)}", params
+
+
+def span_versions(rows, spans):
+    versions = {row['scope']: row['version'] for row in rows}
+    global_version = versions.get('global', 0)
+    result = []
+    for start_date, end_date in spans:
+        if start_date and end_date:
+            first, last = month_scope(start_date), month_scope(end_date)
+            result.append(max((version for scope, version in versions.items()
+                               if len(scope) == 7 and first <= scope <= last), default=0))
+        else:
+            result.append(global_version)
+    return {"global": global_version, "spans": result}
+
+
+def bump_data_version(cursor, expense_date):
+    cursor.execute(BUMP_GLOBAL_VERSION_SQL)
+    cursor.execute(GLOBAL_VERSION_SQL)
+    version = cursor.fetchall()[0]['version']
+    cursor.execute(SET_SCOPE_VERSIONS_SQL, scope_version_params(expense_date, version))
+
+
+class ArchivedYearError(Exception):
+    pass
+
+
+def expense_year(expense_date):
+    return int(str(expense_date)[:4])
+
+
+def check_year_writable(year, archive_rows):
+    if archive_rows:
+        raise ArchivedYearError(f"expenses of {year} are archived and read-only")
+
+
+def ensure_year_writable(cursor, expense_date):
+    # The shared lock makes archive.archive_year wait for this transaction, and a year
+    # that is (being) archived rejects the write, which rolls the transaction back.
+    year = expense_year(expense_date)
+    cursor.execute(YEAR_LOCK_SQL, (year,))
+    check_year_writable(year, cursor.fetchall())
+
+
+def record_date_write(cursor, expense_date):
+    # Everything derived from a date's expenses, updated in the writer's transaction.
+    ensure_year_writable(cursor, expense_date)
+    before = budgets.day_totals(cursor, expense_date)
+    refresh_daily_rollup(cursor, expense_date)
+    budgets.record_day_change(cursor, expense_date, before, budgets.day_totals(cursor, expense_date))
+    refresh_search_index(cursor, expense_date)
+    bump_data_version(cursor, expense_date)
+
+
+@metrics.track_query
+def fetch_archives():
+    # Completed archives only; a row without archived_at is still being written.
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "SELECT year, path, row_count, total, archived_at FROM expense_archives "
+            "WHERE archived_at IS NOT NULL ORDER BY year"
+        )
+        return cursor.fetchall()
+
+
+@metrics.track_query
+def fetch_closed_years():
+    # Years that no longer accept writes: archived or being archived.
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT year FROM expense_archives")
+        return {row['year'] for row in cursor.fetchall()}
+
+
+@metrics.track_query
+def fetch_data_versions(expense_date=None):
+    query, scopes = data_versions_query(expense_date)
+    with get_db_cursor() as cursor:
+        cursor.execute(query, scopes)
+        return data_versions(cursor.fetchall(), scopes)
+
+
+@metrics.track_query
+def fetch_span_versions(*spans):
+    query, params = span_versions_query(spans)
+    with get_db_cursor() as cursor:
+        cursor.execute(query, params)
+        return span_versions(cursor.fetchall(), spans)
+
+
+@metrics.track_query
 def fetch_expenses_for_date(expense_date):
-    logger.info(f"fetch_expenses_for_date called with {expense_date}")
+    logger.debug("fetch_expenses_for_date called with %s", expense_date)
     with get_db_cursor() as cursor:
-        cursor.execute("SELECT * FROM expenses WHERE expense_date = %s", (expense_date,))
+        cursor.execute(EXPENSES_FOR_DATE_SQL, (expense_date,))
         expenses = cursor.fetchall()
-        return expenses
+        if expenses:
+            return expenses
+        # Archived years have no live rows; their expenses are read from the Parquet archive.
+        cursor.execute(ARCHIVE_PATH_SQL, (expense_year(expense_date),))
+        archive = cursor.fetchall()
+    if archive:
+        day = date.fromisoformat(str(expense_date))
+        return export.read_parquet_rows(archive[0]['path'], day, day)
+    return expenses
 
 
+@metrics.track_query
 def delete_expenses_for_date(expense_date):
-    logger.info(f"delete_expenses_for_date called with {expense_date}")
+    logger.info("delete_expenses_for_date called with %s", expense_date)
     with get_db_cursor(commit=True) as cursor:
-        cursor.execute("DELETE FROM expenses WHERE expense_date = %s", (expense_date,))
+        cursor.execute(DELETE_DATE_SQL, (expense_date,))
+        record_date_write(cursor, expense_date)
 
 
+@metrics.track_query
 def insert_expense(expense_date, amount, category, notes):
-    logger.info(f"insert_expense called with date: {expense_date}, amount: {amount}, category: {category}, notes: {notes}")
+    logger.info("insert_expense called with date: %s, amount: %s, category: %s, notes: %s",
+                expense_date, amount, category, notes)
     with get_db_cursor(commit=True) as cursor:
         cursor.execute(
-            "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (%s, %s, %s, %s)",
+            INSERT_EXPENSE_SQL,
             (expense_date, amount, category, notes)
         )
+        record_date_write(cursor, expense_date)
 
 
-def fetch_expense_summary(start_date, end_date):
-    logger.info(f"fetch_expense_summary called with start: {start_date} end: {end_date}")
+@metrics.track_query
+def replace_expenses_for_date(expense_date, expenses):
+    logger.info("replace_expenses_for_date called with %s, %s rows", expense_date, len(expenses))
+    rows = [(expense_date, e['amount'], e['category'], e['notes']) for e in expenses]
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(DELETE_DATE_SQL, (expense_date,))
+        if rows:
+            cursor.executemany(
+                INSERT_EXPENSE_SQL,
+                rows
+            )
+        record_date_write(cursor, expense_date)
+
+
+EXPENSE_FIELDS = ("amount", "category", "notes")
+
+
+class ExpenseNotFound(LookupError):
+    pass
+
+
+def plan_expense_diff(existing, upserts, deletes):
+    """Compare the stored rows of a date with the submitted changes. Returns
+    ``(inserts, updates, deletes)``: upserts without an id are inserted, upserts whose
+    fields differ from the stored row become updates and unchanged ones are dropped.
+    Raises ExpenseNotFound for ids that are not stored under this date."""
+    stored = {row['id']: row for row in existing}
+    upsert_ids = [e['id'] for e in upserts if e.get('id') is not None]
+    unknown = sorted({expense_id for expense_id in upsert_ids + list(deletes) if expense_id not in stored})
+    if unknown:
+        raise ExpenseNotFound(f"expenses {unknown} do not belong to this date")
+
+    inserts, updates = [], []
+    for expense in upserts:
+        if expense.get('id') is None:
+            inserts.append(expense)
+        elif any(expense[field] != stored[expense['id']][field] for field in EXPENSE_FIELDS):
+            updates.append(expense)
+    deleted = sorted(set(deletes))
+    return inserts, [e for e in updates if e['id'] not in deleted], deleted
+
+
+@metrics.track_query
+def apply_expense_diff(expense_date, upserts, deletes):
+    logger.info("apply_expense_diff called with %s, %s upserts, %s deletes", expense_date, len(upserts), len(deletes))
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(
+            "SELECT id, amount, category, notes FROM expenses WHERE expense_date = %s FOR UPDATE",
+            (expense_date,)
+        )
+        inserts, updates, deletes = plan_expense_diff(cursor.fetchall(), upserts, deletes)
+
+        inserted_ids = []
+        for expense in inserts:
+            cursor.execute(
+                INSERT_EXPENSE_SQL,
+                (expense_date, expense['amount'], expense['category'], expense['notes'])
+            )
+            inserted_ids.append(cursor.lastrowid)
+        if updates:
+            cursor.executemany(
+                "UPDATE expenses SET amount = %s, category = %s, notes = %s WHERE id = %s",
+                [(e['amount'], e['category'], e['notes'], e['id']) for e in updates]
+            )
+        if deletes:
+            cursor.execute(
+                f"DELETE FROM expenses WHERE id IN ({', '.join(['%s'] * len(deletes))})", deletes
+            )
+
+        # An unchanged submission leaves the rollups, versions and ETags of the date alone.
+        changed = bool(inserts or updates or deletes)
+        if changed:
+            record_date_write(cursor, expense_date)
+    return {"inserted": inserted_ids, "updated": [e['id'] for e in updates], "deleted": deletes,
+            "changed": changed}
+
+
+@metrics.track_query
+def update_expense(expense_id, changes):
+    # Returns the updated row, or None when the id does not exist.
+    logger.info("update_expense called with %s, fields: %s", expense_id, sorted(changes))
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(
+            "SELECT id, expense_date, amount, category, notes FROM expenses WHERE id = %s FOR UPDATE",
+            (expense_id,)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+        row = rows[0]
+        changes = {field: value for field, value in changes.items()
+                   if field in EXPENSE_FIELDS and row[field] != value}
+        if changes:
+            cursor.execute(
+                f"UPDATE expenses SET {', '.join(f'{field} = %s' for field in changes)} WHERE id = %s",
+                [*changes.values(), expense_id]
+            )
+            record_date_write(cursor, row['expense_date'])
+        return {**row, **changes}
+
+
+@metrics.track_query
+def delete_expense(expense_id):
+    # Returns the date of the deleted row, or None when the id does not exist.
+    logger.info("delete_expense called with %s", expense_id)
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute("SELECT expense_date FROM expenses WHERE id = %s FOR UPDATE", (expense_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+        cursor.execute("DELETE FROM expenses WHERE id = %s", (expense_id,))
+        record_date_write(cursor, rows[0]['expense_date'])
+        return rows[0]['expense_date']
+
+
+@metrics.track_query
+def insert_expenses_batch(rows):
+    logger.info("insert_expenses_batch called with %s rows", len(rows))
+    with get_db_cursor(commit=True) as cursor:
+        cursor.executemany(
+            INSERT_EXPENSE_SQL,
+            rows
+        )
+        # Sorted so concurrent imports lock the rollup/version rows in the same order.
+        for expense_date in sorted({row[0] for row in rows}):
+            record_date_write(cursor, expense_date)
+
+
+@metrics.track_query
+def fetch_expenses_page(start_date=None, end_date=None, category=None, after=None, limit=100):
+    # Keyset pagination on (expense_date, id): `after` is the key of the previous page's last row.
+    # Archived years are read from their Parquet files, in the same order.
+    logger.debug("fetch_expenses_page called with start: %s end: %s category: %s after: %s",
+                 start_date, end_date, category, after)
+    archives = {row['year']: row for row in fetch_archives()}
+    rows = []
+    for first, last, archive in _page_segments(start_date, end_date, archives):
+        if after and last is not None and last < after[0]:
+            continue
+        if archive:
+            rows.extend(_archived_expenses_page(archive['path'], first, last, category, after, limit - len(rows)))
+        else:
+            rows.extend(_live_expenses_page(first, last, category, after, limit - len(rows)))
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _page_segments(start_date, end_date, archives):
+    # Like _year_segments, but either bound may be open (None): live runs between the archived
+    # years in range, which are few, so an unbounded listing needs no year-by-year walk.
+    segments, live_start = [], start_date
+    for year in sorted(archives):
+        year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+        if (start_date and year_end < start_date) or (end_date and year_start > end_date):
+            continue
+        if live_start is None or live_start < year_start:
+            segments.append((live_start, date.fromordinal(year_start.toordinal() - 1), None))
+        segments.append((max(year_start, start_date) if start_date else year_start,
+                         min(year_end, end_date) if end_date else year_end, archives[year]))
+        live_start = date(year + 1, 1, 1)
+    if live_start is None or end_date is None or live_start <= end_date:
+        segments.append((live_start, end_date, None))
+    return segments
+
+
+def _live_expenses_page(start_date, end_date, category, after, limit):
+    conditions, params = [], []
+    if start_date:
+        conditions.append("expense_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("expense_date <= %s")
+        params.append(end_date)
+    if category:
+        conditions.append("category = %s")
+        params.append(category)
+    if after:
+        conditions.append("(expense_date > %s OR (expense_date = %s AND id > %s))")
+        params.extend([after[0], after[0], after[1]])
+
+    query = "SELECT id, expense_date, amount, category, notes FROM expenses"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY expense_date, id LIMIT %s"
+    params.append(limit)
+
+    with get_db_cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
+def _archived_expenses_page(path, start_date, end_date, category, after, limit):
+    # The file is stored in (expense_date, id) order, so the page is the first `limit` rows past
+    # `after`; row groups before the cursor are skipped and the read stops once the page is full.
+    rows = []
+    batches = export.iter_parquet_batches(path, start_date, end_date, category, batch_size=limit, after=after)
+    try:
+        for batch in batches:
+            rows.extend(batch)
+            if len(rows) >= limit:
+                break
+    finally:
+        batches.close()
+    return rows[:limit]
+
+
+@metrics.track_query
+def fetch_search_page(query, start_date=None, end_date=None, category=None, after=None, limit=100):
+    # `query` is a boolean-mode string (search.to_boolean_query). Results are ranked by
+    # relevance, scaled to an integer `rank` so that keyset pagination on (rank, id) can
+    # compare it exactly; `after` is the (rank, id) of the previous page's last row.
+    logger.debug("fetch_search_page called with query: %s start: %s end: %s category: %s after: %s",
+                 query, start_date, end_date, category, after)
+    conditions, params = ["MATCH(notes) AGAINST (%s IN BOOLEAN MODE)"], [query, query, query]
+    if start_date:
+        conditions.append("expense_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("expense_date <= %s")
+        params.append(end_date)
+    if category:
+        conditions.append("category = %s")
+        params.append(category)
+
+    sql = f'''SELECT * FROM (
+                 SELECT expense_id AS id, expense_date, amount, category, notes,
+                        MATCH(notes) AGAINST (%s IN BOOLEAN MODE) AS score,
+                        CAST(ROUND(MATCH(notes) AGAINST (%s IN BOOLEAN MODE) * 1000000) AS SIGNED) AS `rank`
+                 FROM expense_search
+                 WHERE {" AND ".join(conditions)}) AS hits'''
+    if after:
+        sql += " WHERE (`rank` < %s OR (`rank` = %s AND id < %s))"
+        params.extend([after[0], after[0], after[1]])
+    sql += " ORDER BY `rank` DESC, id DESC LIMIT %s"
+    params.append(limit)
+
     with get_db_cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+@metrics.track_query
+def fetch_budget_status(month):
+    # `month` is the first day of the month. Reads only per-category state, never expenses.
+    logger.debug("fetch_budget_status called with %s", month)
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT category, monthly_limit FROM budgets")
+        limits = {row['category']: row['monthly_limit'] for row in cursor.fetchall()}
+        cursor.execute("SELECT category, total FROM category_month_totals WHERE month = %s", (month,))
+        totals = {row['category']: row['total'] for row in cursor.fetchall()}
+        cursor.execute("SELECT category, day_count, mean, m2 FROM category_stats")
+        stats = {row['category']: (row['day_count'], row['mean'], row['m2']) for row in cursor.fetchall()}
+    return budgets.summarize(limits, totals, stats)
+
+
+@metrics.track_query
+def set_budget(category, monthly_limit):
+    logger.info("set_budget called with %s, %s", category, monthly_limit)
+    with get_db_cursor(commit=True) as cursor:
         cursor.execute(
-            '''SELECT category, SUM(amount) as total 
-               FROM expenses WHERE expense_date
-               BETWEEN %s and %s  
-               GROUP BY category;''',
-            (start_date, end_date)
+            '''INSERT INTO budgets (category, monthly_limit) VALUES (%s, %s) AS new
+               ON DUPLICATE KEY UPDATE monthly_limit = new.monthly_limit''',
+            (category, monthly_limit)
         )
+
+
+@metrics.track_query
+def delete_budget(category):
+    # Returns whether the category had a budget.
+    logger.info("delete_budget called with %s", category)
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM budgets WHERE category = %s", (category,))
+        return cursor.rowcount > 0
+
+
+@metrics.track_query
+def fetch_alerts(start_date, end_date, category=None):
+    logger.debug("fetch_alerts called with start: %s end: %s category: %s", start_date, end_date, category)
+    extra = [category] if category else []
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            f'''SELECT expense_date, category, total, mean, std_dev, z_score FROM spending_alerts
+               WHERE expense_date BETWEEN %s AND %s{' AND category = %s' if category else ''}
+               ORDER BY expense_date DESC, z_score DESC''',
+            [start_date, end_date, *extra]
+        )
+        anomalies = cursor.fetchall()
+        cursor.execute(
+            f'''SELECT t.month, t.category, t.total AS spent, b.monthly_limit
+               FROM category_month_totals t JOIN budgets b ON b.category = t.category
+               WHERE t.month BETWEEN %s AND %s AND t.total > b.monthly_limit{' AND t.category = %s' if category else ''}
+               ORDER BY t.month DESC, t.category''',
+            [budgets.month_of(start_date), end_date, *extra]
+        )
+        over_budget = cursor.fetchall()
+    return {"anomalies": anomalies, "over_budget": over_budget}
+
+
+def _year_segments(start_date, end_date, archives):
+    # Split [start_date, end_date] into runs of consecutive live or archived years, in order.
+    segments = []
+    for year in range(start_date.year, end_date.year + 1):
+        archive = archives.get(year)
+        first, last = max(start_date, date(year, 1, 1)), min(end_date, date(year, 12, 31))
+        if segments and archive is None and segments[-1][2] is None:
+            segments[-1] = (segments[-1][0], last, None)
+        else:
+            segments.append((first, last, archive))
+    return segments
+
+
+@metrics.track_query
+def stream_expenses(start_date, end_date, category=None, batch_size=10000):
+    # Reads archived years from their Parquet files and live years from MySQL, in
+    # (expense_date, id) order either way.
+    logger.debug("stream_expenses called with start: %s end: %s category: %s",
+                 start_date, end_date, category)
+    archives = {row['year']: row for row in fetch_archives()}
+    for first, last, archive in _year_segments(start_date, end_date, archives):
+        if archive:
+            yield from export.iter_parquet_batches(archive['path'], first, last, category, batch_size)
+        else:
+            yield from _stream_live_expenses(first, last, category, batch_size)
+
+
+def _stream_live_expenses(start_date, end_date, category, batch_size):
+    # Generator over an unbuffered cursor: rows are pulled from the server batch by batch, and the
+    # pooled connection is held until the caller finishes (or closes) the iteration.
+    query = "SELECT id, expense_date, amount, category, notes FROM expenses WHERE expense_date BETWEEN %s AND %s"
+    params = [start_date, end_date]
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    query += " ORDER BY expense_date, id"
+
+    with get_db_cursor() as cursor:
+        cursor.execute(query, params)
+        while rows := cursor.fetchmany(batch_size):
+            yield rows
+
+
+@metrics.track_query
+def fetch_expense_summary(start_date, end_date):
+    logger.debug("fetch_expense_summary called with start: %s end: %s", start_date, end_date)
+    with get_db_cursor() as cursor:
+        cursor.execute(EXPENSE_SUMMARY_SQL, (start_date, end_date))
         data = cursor.fetchall()
         return data
 
 
+@metrics.track_query
 def fetch_monthly_expense_summary():
-    logger.info(f"fetch_expense_summary_by_months")
+    logger.debug("fetch_expense_summary_by_months")
     with get_db_cursor() as cursor:
-        cursor.execute(
-            '''SELECT month(expense_date) as expense_month, 
-               monthname(expense_date) as month_name,
-               sum(amount) as total FROM expenses
-               GROUP BY expense_month, month_name;
-            '''
-        )
+        cursor.execute(MONTHLY_SUMMARY_SQL)
         data = cursor.fetchall()
         return data
 
 
+@metrics.track_query
+def fetch_rollup_snapshot(expense_date=None):
+    # The global data version and the rollup rows (of one date, or all), read in one
+    # transaction so the rows are exactly those of that version.
+    with get_db_cursor() as cursor:
+        cursor.execute(GLOBAL_VERSION_SQL)
+        versions = cursor.fetchall()
+        query = "SELECT expense_date, category, total, expense_count FROM expense_daily_rollup"
+        if expense_date is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query + " WHERE expense_date = %s", (expense_date,))
+        rows = cursor.fetchall()
+    return (versions[0]['version'] if versions else 0), rows
+
+
+def bucketed_totals_query(start_date, end_date, bucket, by_category=False, category=None):
+    group_by = "bucket, category" if by_category else "bucket"
+    params = [start_date, end_date]
+    if category:
+        params.append(category)
+    query = f'''SELECT {BUCKET_SQL[bucket]} AS bucket{', category' if by_category else ''},
+                      SUM(total) AS total, SUM(expense_count) AS expense_count
+               FROM expense_daily_rollup
+               WHERE expense_date BETWEEN %s AND %s{' AND category = %s' if category else ''}
+               GROUP BY {group_by}
+               ORDER BY {group_by}'''
+    return query, params
+
+
+@metrics.track_query
+def fetch_bucketed_totals(start_date, end_date, bucket, by_category=False, category=None):
+    logger.debug("fetch_bucketed_totals called with start: %s end: %s bucket: %s",
+                 start_date, end_date, bucket)
+    query, params = bucketed_totals_query(start_date, end_date, bucket, by_category, category)
+    with get_db_cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
 if __name__ == "__main__":
      expenses = fetch_expenses_for_date("2024-09-30")
      print(expenses)
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of DB-API connections.
+
+    ``connect`` is a zero-argument callable returning a new connection. Idle
+    connections are handed out most-recently-used first and are health checked
+    with ``is_healthy`` when they have been idle for longer than ``ping_interval``
+    seconds. ``acquire`` blocks for at most ``timeout`` seconds when all
+    ``max_size`` connections are checked out.
+    """
+
+    def __init__(self, connect, min_size=2, max_size=10, timeout=5.0, ping_interval=30.0,
+                 is_healthy=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"invalid pool size: min={min_size} max={max_size}")
+
+        self._connect = connect
+        self._is_healthy = is_healthy or (lambda connection: connection.is_connected())
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._checkout_time_total = 0.0
+        self._checkout_time_max = 0.0
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection, last_used = None, None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"timed out after {timeout:.1f}s waiting for a connection "
+                        f"({self._in_use}/{self.max_size} in use)"
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            self._in_use += 1
+
+        # Opening and pinging happen outside the lock; the slot is already reserved.
+        try:
+            if connection is not None and time.monotonic() - last_used > self.ping_interval:
+                if not self._healthy(connection):
+                    self._close_quietly(connection)
+                    connection = None
+                    with self._cond:
+                        self._discarded += 1
+            if connection is None:
+                connection = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._checkout_time_total += elapsed
+            self._checkout_time_max = max(self._checkout_time_max, elapsed)
+        return connection
+
+    def release(self, connection, discard=False):
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                self._discarded += discard
+            else:
+                self._idle.append((connection, time.monotonic()))
+                connection = None
+            self._cond.notify()
+
+        if connection is not None:
+            self._close_quietly(connection)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": self._waiters,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "checkout_ms_avg": (self._checkout_time_total / checkouts * 1000) if checkouts else 0.0,
+                "checkout_ms_max": self._checkout_time_max * 1000,
+            }
+
+    def _healthy(self, connection):
+        try:
+            return bool(self._is_healthy(connection))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
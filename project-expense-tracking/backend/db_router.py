@@ -0,0 +1,134 @@
+import contextvars
+from contextlib import contextmanager
+import threading
+import time
+
+
+# Routing state of the current HTTP request, shared (as one dict) with the threadpool
+# workers that run its queries. Outside a request (CLIs, migrations) it is unset and
+# every query goes to the primary.
+_request_state = contextvars.ContextVar("db_request_state", default=None)
+
+
+def start_request(primary_until=0.0):
+    """Let the current request's reads use replicas. ``primary_until`` (epoch seconds)
+    carries read-your-writes stickiness over from an earlier request of the same client."""
+    state = {"primary_until": primary_until}
+    return state, _request_state.set(state)
+
+
+def end_request(token):
+    _request_state.reset(token)
+
+
+def note_write(sticky_seconds):
+    # After a write, this request (and the client, via the server's cookie) reads from the primary.
+    state = _request_state.get()
+    if state is not None:
+        state["primary_until"] = max(state["primary_until"], time.time() + sticky_seconds)
+
+
+@contextmanager
+def primary_only():
+    """Send the reads made inside the block to the primary, e.g. a columnar snapshot load,
+    which must not go back to an older version than the snapshot already has."""
+    token = _request_state.set(None)
+    try:
+        yield
+    finally:
+        _request_state.reset(token)
+
+
+def request_replica(router):
+    """The replica serving the current request's reads, chosen on its first read. Keeping
+    one replica per request keeps its reads monotonic: data read after the data version
+    is at least that version. Returns None (use the primary) when there is no healthy
+    replica, or when the chosen one failed, since switching could go back in time."""
+    state = _request_state.get()
+    if "replica" not in state:
+        state.setdefault("replica", router.choose())
+    replica = state["replica"]
+    return replica if replica is not None and replica.healthy else None
+
+
+def replica_reads_allowed():
+    state = _request_state.get()
+    return state is not None and state["primary_until"] <= time.time()
+
+
+class Replica:
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag = None
+        self.error = None
+        self.checked_at = float("-inf")
+        self.lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """Picks a replica for a read, round robin over those that are reachable and at most
+    ``max_lag`` seconds behind. ``check_lag(connection)`` returns the replica's lag in
+    seconds, or None when replication is stopped. Health is rechecked every
+    ``check_interval`` seconds, by one thread at a time."""
+
+    def __init__(self, replicas, check_lag, max_lag=5.0, check_interval=5.0, logger=None):
+        self.replicas = list(replicas)
+        self.check_lag = check_lag
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.logger = logger
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _check(self, replica):
+        # Non-blocking: while another thread is checking, the previous result is used.
+        if not replica.lock.acquire(blocking=False):
+            return
+        try:
+            connection = replica.pool.acquire()
+            discard = False
+            try:
+                lag = self.check_lag(connection)
+            except Exception:
+                discard = True
+                raise
+            finally:
+                replica.pool.release(connection, discard=discard)
+            replica.lag, replica.error = lag, None
+            replica.healthy = lag is not None and lag <= self.max_lag
+        except Exception as e:
+            replica.healthy, replica.lag, replica.error = False, None, str(e)
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.lock.release()
+        if not replica.healthy and self.logger:
+            self.logger.warning("replica %s unavailable for reads: lag=%s error=%s",
+                                replica.name, replica.lag, replica.error)
+
+    def choose(self):
+        now = time.monotonic()
+        for replica in self.replicas:
+            if now - replica.checked_at >= self.check_interval:
+                self._check(replica)
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        with self._lock:
+            self._next += 1
+            return healthy[self._next % len(healthy)]
+
+    def mark_unhealthy(self, replica, error):
+        # Skipped until its next health check.
+        replica.healthy, replica.error = False, str(error)
+        replica.checked_at = time.monotonic()
+        if self.logger:
+            self.logger.warning("replica %s failed, reading from the primary: %s", replica.name, error)
+
+    def stats(self):
+        return {
+            replica.name: {"healthy": replica.healthy, "lag": replica.lag, "error": replica.error,
+                           **replica.pool.stats()}
+            for replica in self.replicas
+        }
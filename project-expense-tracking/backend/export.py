@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = ds = pq = None
+
+
+COLUMNS = ["id", "expense_date", "amount", "category", "notes"]
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def csv_stream(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row[column] for column in COLUMNS] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+def ndjson_stream(batches):
+    for rows in batches:
+        yield "".join(
+            json.dumps({
+                "id": row["id"],
+                "expense_date": row["expense_date"].isoformat(),
+                "amount": float(row["amount"]),
+                "category": row["category"],
+                "notes": row["notes"],
+            }) + "\n"
+            for row in rows
+        ).encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever the Parquet writer flushed."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("expense_date", pa.date32()),
+        ("amount", pa.decimal128(12, 2)),
+        ("category", pa.string()),
+        ("notes", pa.string()),
+    ])
+
+
+def parquet_stream(batches, compression="zstd"):
+    # Each DB batch becomes one row group, written out as soon as it is complete.
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    try:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet support requires the 'pyarrow' package")
+
+
+def read_parquet_rows(path, start_date, end_date, category=None):
+    """Rows of an expense Parquet file in a date range, as dicts like the DB rows.
+    Row-group statistics let point lookups skip most of a sorted file."""
+    _require_pyarrow()
+    filters = [("expense_date", ">=", start_date), ("expense_date", "<=", end_date)]
+    if category:
+        filters.append(("category", "=", category))
+    return pq.read_table(path, schema=parquet_schema(), filters=filters).to_pylist()
+
+
+def parquet_filter(start_date, end_date, category=None, after=None):
+    """Dataset expression for rows in a date range (and category), past the keyset
+    ``after`` = (expense_date, id) when given."""
+    expense_date = ds.field("expense_date")
+    expression = (expense_date >= start_date) & (expense_date <= end_date)
+    if category:
+        expression &= ds.field("category") == category
+    if after:
+        after_date, after_id = after
+        expression &= (expense_date > after_date) | ((expense_date == after_date) & (ds.field("id") > after_id))
+    return expression
+
+
+def parquet_row_groups(path, expression):
+    # Row groups whose min/max statistics can match the expression, in file order.
+    fragment = next(ds.dataset(path, format="parquet", schema=parquet_schema()).get_fragments())
+    return [piece.row_groups[0].id for piece in fragment.split_by_row_group(expression)]
+
+
+def iter_parquet_batches(path, start_date, end_date, category=None, batch_size=10000, after=None):
+    # Streams the file in its stored (expense_date, id) order, reading only the row groups
+    # that can hold matching rows, so a page deep into a year costs no more than the first.
+    _require_pyarrow()
+    expression = parquet_filter(start_date, end_date, category, after)
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=parquet_row_groups(path, expression)):
+        rows = pa.Table.from_batches([batch]).filter(expression).to_pylist()
+        if rows:
+            yield rows
+
+
+def stream(fmt, batches):
+    if fmt == "csv":
+        return csv_stream(batches)
+    if fmt == "ndjson":
+        return ndjson_stream(batches)
+    if fmt == "parquet":
+        _require_pyarrow()
+        return parquet_stream(batches)
+    raise ValueError(f"unsupported export format {fmt!r}")
@@ -1,17 +1,113 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import config
 
 
-def setup_logger(name, log_file='server.log', level=logging.DEBUG):
-    # Create a custom logger
-    logger = logging.getLogger(name)
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    # The listener runs in this process, so records can be queued as-is: message
+    # formatting (and any traceback rendering) happens on the writer thread. The
+    # args passed to a log call must therefore not be mutated afterwards.
+    def prepare(self, record):
+        return record
+
+
+_queue = queue.SimpleQueue()
+_listener = None
+_log_file = None
+_lock = threading.Lock()
+
+
+def _log_path(log_file):
+    if config.LOG_PER_PROCESS:
+        root, ext = os.path.splitext(log_file)
+        return f"{root}.{os.getpid()}{ext}"
+    return log_file
+
+
+def _file_handler(log_file):
+    path = _log_path(log_file)
+    if config.LOG_ROTATION == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=config.LOG_ROTATE_WHEN, backupCount=config.LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    if config.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'))
+    return handler
+
 
-    # Configure the custom logger
-    logger.setLevel(level)
-    file_handler = logging.FileHandler(log_file)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+def _start_listener(log_file):
+    global _listener, _log_file
+    with _lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(_queue, _file_handler(log_file))
+            _listener.start()
+            _log_file = log_file
+        elif log_file != _log_file:
+            raise ValueError(f"Logging already writes to {_log_file}; all loggers share one file.")
 
-    return logger#import logging
 
+def _stop_listener():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_after_fork():
+    # The writer thread does not survive fork(); give the child its own thread and file.
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        _start_listener(_log_file)
+
+
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def module_level(name):
+    return config.LOG_LEVELS.get(name, config.LOG_LEVEL)
+
+
+def setup_logger(name, log_file=None, level=None):
+    """Return the named logger, writing through the shared background queue.
+    All loggers share the file of the first call: asking for a different
+    ``log_file`` afterwards raises ValueError. Calling it again for the same
+    name does not add another handler."""
+    logger = logging.getLogger(name)
+    logger.setLevel(level or module_level(name))
+    if not any(isinstance(handler, _LazyQueueHandler) for handler in logger.handlers):
+        _start_listener(log_file or config.LOG_FILE)
+        logger.addHandler(_LazyQueueHandler(_queue))
+        logger.propagate = False
 
+    return logger
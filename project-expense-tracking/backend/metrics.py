@@ -0,0 +1,185 @@
+import bisect
+import functools
+import inspect
+import reprlib
+import threading
+import time
+import config
+from logging_setup import setup_logger
+
+
+slow_query_logger = setup_logger('slow_query')
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class GaugeCallback:
+    """Gauge whose samples are read from ``collect()`` at scrape time: a dict mapping
+    label value tuples to numbers."""
+
+    def __init__(self, name, help, labelnames, collect):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_DURATION = register(Histogram(
+    "http_request_duration_seconds", "Time until the response headers are ready, by route and status.",
+    ("method", "route", "status"),
+))
+DB_QUERY_DURATION = register(Histogram(
+    "db_query_duration_seconds", "Duration of db_helper calls, including connection checkout.", ("query",),
+))
+DB_QUERY_ROWS = register(Counter(
+    "db_query_rows_total", "Rows returned by db_helper calls.", ("query",),
+))
+DB_QUERY_ERRORS = register(Counter(
+    "db_query_errors_total", "db_helper calls that raised.", ("query",),
+))
+DB_CONNECTION_ACQUIRE = register(Histogram(
+    "db_connection_acquire_seconds", "Time spent waiting for a pooled connection.", ("driver",),
+))
+
+
+def _count_rows(result):
+    return len(result) if isinstance(result, (list, tuple)) else 0
+
+
+def _record(name, started, rows, args):
+    elapsed = time.perf_counter() - started
+    DB_QUERY_DURATION.observe(elapsed, name)
+    if rows:
+        DB_QUERY_ROWS.inc(name, amount=rows)
+    if config.SLOW_QUERY_MS and elapsed * 1000 >= config.SLOW_QUERY_MS:
+        slow_query_logger.warning("slow query %s took %.1f ms (%s rows) args=%s",
+                                  name, elapsed * 1000, rows, reprlib.repr(args))
+
+
+def track_query(func):
+    """Record duration, row count and errors of a db_helper function. Works for plain
+    functions, coroutines and generators yielding row batches."""
+    name = f"{func.__module__}.{func.__name__}"
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            started, rows = time.perf_counter(), 0
+            batches = func(*args, **kwargs)
+            try:
+                for batch in batches:
+                    rows += _count_rows(batch)
+                    yield batch
+            except Exception:
+                DB_QUERY_ERRORS.inc(name)
+                raise
+            finally:
+                batches.close()
+                _record(name, started, rows, args)
+        return generator_wrapper
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            try:
+                result = await func(*args, **kwargs)
+                return result
+            except Exception:
+                DB_QUERY_ERRORS.inc(name)
+                raise
+            finally:
+                _record(name, started, _count_rows(result), args)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception:
+            DB_QUERY_ERRORS.inc(name)
+            raise
+        finally:
+            _record(name, started, _count_rows(result), args)
+    return wrapper
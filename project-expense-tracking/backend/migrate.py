@@ -0,0 +1,95 @@
+import argparse
+import os
+import re
+import sys
+from db_helper import get_db_cursor, logger
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+# Several uvicorn workers may start at once; only one of them applies migrations.
+LOCK_NAME = "expense_manager.schema_migrations"
+LOCK_TIMEOUT = 60
+
+
+def load_migrations():
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute(
+        '''CREATE TABLE IF NOT EXISTS schema_migrations (
+               version int NOT NULL,
+               name varchar(255) NOT NULL,
+               applied_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (version)
+           )'''
+    )
+
+
+def _applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row['version'] for row in cursor.fetchall()}
+
+
+def migration_status():
+    with get_db_cursor() as cursor:
+        _ensure_migrations_table(cursor)
+        applied = _applied_versions(cursor)
+    return [(version, name, version in applied) for version, name, _ in load_migrations()]
+
+
+def apply_migrations():
+    applied_now = []
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS acquired", (LOCK_NAME, LOCK_TIMEOUT))
+        if not cursor.fetchall()[0]['acquired']:
+            raise RuntimeError(f"could not acquire migration lock {LOCK_NAME!r}")
+        try:
+            _ensure_migrations_table(cursor)
+            applied = _applied_versions(cursor)
+            for version, name, path in load_migrations():
+                if version in applied:
+                    continue
+                logger.info("applying migration %04d_%s", version, name)
+                with open(path, encoding="utf-8") as f:
+                    for statement in split_statements(f.read()):
+                        cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                cursor.execute("COMMIT")
+                applied_now.append(f"{version:04d}_{name}")
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            cursor.fetchall()
+    return applied_now
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations.")
+    parser.add_argument("command", nargs="?", choices=["up", "status"], default="up")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for version, name, applied in migration_status():
+            print(f"{version:04d}_{name}: {'applied' if applied else 'pending'}")
+        return 0
+
+    applied = apply_migrations()
+    for name in applied:
+        print(f"Applied {name}")
+    print(f"{len(applied)} migrations applied")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
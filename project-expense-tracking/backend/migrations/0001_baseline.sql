@@ -0,0 +1,19 @@
+-- Schema as shipped in database/expense_db_creation.sql. A no-op on databases
+-- created from that dump.
+
+CREATE TABLE IF NOT EXISTS expenses (
+  id int NOT NULL AUTO_INCREMENT,
+  expense_date date NOT NULL,
+  amount float NOT NULL,
+  category varchar(255) NOT NULL,
+  notes text,
+  PRIMARY KEY (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS expense_daily_rollup (
+  expense_date date NOT NULL,
+  category varchar(255) NOT NULL,
+  total double NOT NULL,
+  expense_count int NOT NULL,
+  PRIMARY KEY (expense_date, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,4 @@
+-- Date lookups, per-date deletes/rollup refreshes and BETWEEN ranges become
+-- index range scans instead of full table scans.
+
+ALTER TABLE expenses ADD INDEX idx_expenses_date_category (expense_date, category);
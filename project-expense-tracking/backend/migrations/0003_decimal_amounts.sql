@@ -0,0 +1,13 @@
+-- Store money as exact DECIMAL so SUM() no longer accumulates float error.
+-- Existing float values are rounded to the nearest cent.
+
+ALTER TABLE expenses MODIFY amount DECIMAL(12,2) NOT NULL;
+
+ALTER TABLE expense_daily_rollup MODIFY total DECIMAL(14,2) NOT NULL;
+
+DELETE FROM expense_daily_rollup;
+
+INSERT INTO expense_daily_rollup (expense_date, category, total, expense_count)
+SELECT expense_date, category, SUM(amount), COUNT(*)
+FROM expenses
+GROUP BY expense_date, category;
@@ -0,0 +1,10 @@
+-- Change counters behind the ETags of the read endpoints: one row per written
+-- date plus a 'global' row. Every write transaction bumps both.
+
+CREATE TABLE data_versions (
+  scope varchar(16) NOT NULL,
+  version bigint unsigned NOT NULL,
+  PRIMARY KEY (scope)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT INTO data_versions (scope, version) VALUES ('global', 1);
@@ -0,0 +1,6 @@
+-- Seek indexes for GET /expenses keyset pagination on (expense_date, id), with and
+-- without a category filter, so deep pages cost the same as the first one.
+
+ALTER TABLE expenses ADD INDEX idx_expenses_date_id (expense_date, id);
+
+ALTER TABLE expenses ADD INDEX idx_expenses_category_date_id (category, expense_date, id);
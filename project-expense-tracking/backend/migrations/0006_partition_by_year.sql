@@ -0,0 +1,50 @@
+-- Partition expenses (and its rollup) by year, so date and range queries only
+-- touch the partitions of the years they ask for, and whole years can be
+-- archived and truncated (see archive.py). MySQL requires the partitioning
+-- column in every unique key, hence the (id, expense_date) primary key. Later
+-- years are split off p_future by `python archive.py partitions`.
+
+ALTER TABLE expenses DROP PRIMARY KEY, ADD PRIMARY KEY (id, expense_date);
+
+ALTER TABLE expenses PARTITION BY RANGE (YEAR(expense_date)) (
+  PARTITION p_old VALUES LESS THAN (2020),
+  PARTITION p2020 VALUES LESS THAN (2021),
+  PARTITION p2021 VALUES LESS THAN (2022),
+  PARTITION p2022 VALUES LESS THAN (2023),
+  PARTITION p2023 VALUES LESS THAN (2024),
+  PARTITION p2024 VALUES LESS THAN (2025),
+  PARTITION p2025 VALUES LESS THAN (2026),
+  PARTITION p2026 VALUES LESS THAN (2027),
+  PARTITION p2027 VALUES LESS THAN (2028),
+  PARTITION p2028 VALUES LESS THAN (2029),
+  PARTITION p2029 VALUES LESS THAN (2030),
+  PARTITION p2030 VALUES LESS THAN (2031),
+  PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+ALTER TABLE expense_daily_rollup PARTITION BY RANGE (YEAR(expense_date)) (
+  PARTITION p_old VALUES LESS THAN (2020),
+  PARTITION p2020 VALUES LESS THAN (2021),
+  PARTITION p2021 VALUES LESS THAN (2022),
+  PARTITION p2022 VALUES LESS THAN (2023),
+  PARTITION p2023 VALUES LESS THAN (2024),
+  PARTITION p2024 VALUES LESS THAN (2025),
+  PARTITION p2025 VALUES LESS THAN (2026),
+  PARTITION p2026 VALUES LESS THAN (2027),
+  PARTITION p2027 VALUES LESS THAN (2028),
+  PARTITION p2028 VALUES LESS THAN (2029),
+  PARTITION p2029 VALUES LESS THAN (2030),
+  PARTITION p2030 VALUES LESS THAN (2031),
+  PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- One row per archived year. A row without archived_at marks an archive in progress;
+-- either way the year no longer accepts writes.
+CREATE TABLE expense_archives (
+  year smallint NOT NULL,
+  path varchar(1024) DEFAULT NULL,
+  row_count bigint unsigned DEFAULT NULL,
+  total decimal(16,2) DEFAULT NULL,
+  archived_at timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (year)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,19 @@
+-- Full-text search over notes for GET /search. InnoDB does not support FULLTEXT
+-- indexes on partitioned tables, so the searchable columns are copied into this
+-- unpartitioned table, which every write transaction keeps in sync per date
+-- (db_helper.refresh_search_index). Rows of archived years stay here, so they
+-- remain searchable after their live rows are dropped.
+
+CREATE TABLE expense_search (
+  expense_id int NOT NULL,
+  expense_date date NOT NULL,
+  amount decimal(12,2) NOT NULL,
+  category varchar(255) NOT NULL,
+  notes text,
+  PRIMARY KEY (expense_id),
+  KEY idx_expense_search_date (expense_date),
+  FULLTEXT KEY ft_expense_search_notes (notes)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT INTO expense_search (expense_id, expense_date, amount, category, notes)
+SELECT id, expense_date, amount, category, notes FROM expenses;
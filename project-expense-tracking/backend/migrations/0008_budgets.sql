@@ -0,0 +1,43 @@
+-- Monthly budgets and the incrementally maintained state behind GET /budgets and
+-- GET /alerts (see budgets.py): running statistics of each category's daily totals
+-- (Welford: count, mean, sum of squared deviations), per-month totals, and the days
+-- flagged as unusually high. Statistics and month totals are seeded from the rollups.
+
+CREATE TABLE budgets (
+  category varchar(255) NOT NULL,
+  monthly_limit decimal(12,2) NOT NULL,
+  PRIMARY KEY (category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE category_stats (
+  category varchar(255) NOT NULL,
+  day_count bigint unsigned NOT NULL DEFAULT 0,
+  mean double NOT NULL DEFAULT 0,
+  m2 double NOT NULL DEFAULT 0,
+  PRIMARY KEY (category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE category_month_totals (
+  month date NOT NULL,
+  category varchar(255) NOT NULL,
+  total decimal(16,2) NOT NULL,
+  PRIMARY KEY (month, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE spending_alerts (
+  expense_date date NOT NULL,
+  category varchar(255) NOT NULL,
+  total decimal(14,2) NOT NULL,
+  mean double NOT NULL,
+  std_dev double NOT NULL,
+  z_score double NOT NULL,
+  PRIMARY KEY (expense_date, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT INTO category_stats (category, day_count, mean, m2)
+SELECT category, COUNT(*), AVG(total), VAR_POP(total) * COUNT(*)
+FROM expense_daily_rollup GROUP BY category;
+
+INSERT INTO category_month_totals (month, category, total)
+SELECT expense_date - INTERVAL (DAY(expense_date) - 1) DAY AS month, category, SUM(total)
+FROM expense_daily_rollup GROUP BY month, category;
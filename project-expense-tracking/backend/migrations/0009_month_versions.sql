@@ -0,0 +1,7 @@
+-- Per-month data versions ('YYYY-MM' scopes): every write sets its date and month to
+-- the new global version, and cached results and ETags of a date range use the largest
+-- month version in it. Months already holding data start at the current global version.
+
+INSERT INTO data_versions (scope, version)
+SELECT DISTINCT LEFT(expense_date, 7), (SELECT version FROM data_versions WHERE scope = 'global')
+FROM expense_daily_rollup;
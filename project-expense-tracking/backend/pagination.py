@@ -0,0 +1,22 @@
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    """Opaque, URL-safe token for the sort key of the last row on a page."""
+    raw = json.dumps([str(value) if not isinstance(value, (int, float)) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise InvalidCursor("malformed cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("malformed cursor")
+    return values
@@ -0,0 +1,74 @@
+import argparse
+import sys
+import budgets
+from db_helper import get_db_cursor, logger
+
+
+# Archived years have no live rows left; their rollups are the only MySQL copy of
+# their totals and are never rebuilt or compared.
+LIVE_YEARS = "YEAR(expense_date) NOT IN (SELECT year FROM expense_archives WHERE archived_at IS NOT NULL)"
+
+
+def rebuild_rollups():
+    logger.info("rebuild_rollups called")
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(f"DELETE FROM expense_daily_rollup WHERE {LIVE_YEARS}")
+        cursor.execute(
+            f'''INSERT INTO expense_daily_rollup (expense_date, category, total, expense_count)
+               SELECT expense_date, category, SUM(amount), COUNT(*)
+               FROM expenses
+               WHERE {LIVE_YEARS}
+               GROUP BY expense_date, category'''
+        )
+        rows = cursor.rowcount
+        # Budget statistics and month totals are derived from the rollups.
+        budgets.rebuild_stats(cursor)
+        return rows
+
+
+def verify_rollups():
+    logger.info("verify_rollups called")
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            f'''SELECT e.expense_date, e.category,
+                      e.total AS expected_total, e.expense_count AS expected_count,
+                      r.total AS rollup_total, r.expense_count AS rollup_count
+               FROM (SELECT expense_date, category, SUM(amount) AS total, COUNT(*) AS expense_count
+                     FROM expenses WHERE {LIVE_YEARS} GROUP BY expense_date, category) e
+               LEFT JOIN expense_daily_rollup r
+                 ON r.expense_date = e.expense_date AND r.category = e.category
+               WHERE r.expense_date IS NULL
+                  OR r.expense_count <> e.expense_count
+                  OR r.total <> e.total
+               UNION ALL
+               SELECT r.expense_date, r.category, NULL, NULL, r.total, r.expense_count
+               FROM expense_daily_rollup r
+               WHERE {LIVE_YEARS}
+                 AND NOT EXISTS (SELECT 1 FROM expenses e
+                                 WHERE e.expense_date = r.expense_date AND e.category = r.category)
+               ORDER BY expense_date, category'''
+        )
+        return cursor.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify the expense_daily_rollup table.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        rows = rebuild_rollups()
+        print(f"Rebuilt expense_daily_rollup: {rows} rows")
+        return 0
+
+    drift = verify_rollups()
+    for row in drift:
+        print(f"{row['expense_date']} {row['category']}: "
+              f"expected total={row['expected_total']} count={row['expected_count']}, "
+              f"rollup total={row['rollup_total']} count={row['rollup_count']}")
+    print(f"{len(drift)} drifted rollup rows")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import re
+
+
+MAX_TERMS = 16
+
+# A quoted phrase or a single word; everything else (including the boolean-mode
+# operators + - < > ( ) ~ * @) only separates terms.
+_TERM = re.compile(r'"([^"]*)"|(\w+)')
+_WORD = re.compile(r"\w+")
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def to_boolean_query(text):
+    """Turn user input into a MySQL boolean-mode full-text query: every word must occur,
+    as a prefix (``uber rid`` matches "Uber ride"), and a quoted phrase must occur as is."""
+    terms = []
+    for phrase, word in _TERM.findall(text or ""):
+        if word:
+            terms.append(f"+{word}*")
+        else:
+            words = _WORD.findall(phrase)
+            if words:
+                terms.append(f'+"{" ".join(words)}"')
+    if not terms:
+        raise InvalidQuery("search query has no words")
+    if len(terms) > MAX_TERMS:
+        raise InvalidQuery(f"search query has more than {MAX_TERMS} terms")
+    return " ".join(terms)
@@ -1,70 +1,637 @@
-from fastapi import FastAPI, HTTPException
-from datetime import date
-from typing import List
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Annotated, List, Literal, Optional
+import anyio
+from pydantic import BaseModel, Field, PlainSerializer
+import async_db_helper
+import bulk_import
+import cache
+import columnar
+import config
 import db_helper  # Ensure this module is properly implemented and available
+import db_router
+import export
+import metrics
+import migrate
+import pagination
+import search
+import timeseries
+import trends
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.DB_AUTO_MIGRATE:
+        migrate.apply_migrations()
+    if config.DB_ASYNC:
+        await async_db_helper.get_pool()
+    if config.COLUMNAR_ENABLED:
+        await run_in_threadpool(columnar.load_from_db, snapshot)
+    yield
+    db_helper.close_pool()
+    await async_db_helper.close_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+result_cache = cache.create_cache(config.CACHE_MAX_ENTRIES, config.CACHE_TTL, config.CACHE_REDIS_URL)
+# Only built when enabled: numpy is optional.
+snapshot = columnar.ColumnarSnapshot() if config.COLUMNAR_ENABLED else None
+_snapshot_reload = None
+
+metrics.register(metrics.GaugeCallback(
+    "db_pool_connections", "Connections in the sync pool by state.", ("state",),
+    lambda: {(state,): db_helper.get_pool_stats().get(state, 0) for state in ("size", "idle", "in_use", "waiters")},
+))
+metrics.register(metrics.GaugeCallback(
+    "result_cache_events", "Result cache counters (hits, misses, evictions, invalidations) and size.", ("event",),
+    lambda: {(name,): value for name, value in result_cache.stats().items() if name != "hit_ratio"},
+))
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep the series count bounded.
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started, request.method, route.path if route else "unmatched", str(status)
+        )
+
+
+STICKY_COOKIE = "db_primary_until"
+
+
+@app.middleware("http")
+async def route_reads(request: Request, call_next):
+    # Reads of this request may use replicas. A client that wrote within the last
+    # DB_STICKY_SECONDS reads from the primary, so it sees its own writes.
+    if not config.DB_REPLICA_HOSTS:
+        return await call_next(request)
+    try:
+        primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0.0
+    state, token = db_router.start_request(primary_until)
+    try:
+        response = await call_next(request)
+    finally:
+        db_router.end_request(token)
+    if state["primary_until"] > primary_until:
+        response.set_cookie(STICKY_COOKIE, f"{state['primary_until']:.3f}",
+                            max_age=max(1, int(config.DB_STICKY_SECONDS)), httponly=True)
+    return response
+
+# Amounts are exact DECIMAL(12,2) in MySQL; they travel as JSON numbers.
+Amount = Annotated[
+    Decimal,
+    Field(max_digits=12, decimal_places=2),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
 
 
 class Expense(BaseModel):
-    amount: float
+    id: Optional[int] = None
+    amount: Amount
     category: str
     notes: str
 
 
+class ExpensePatch(BaseModel):
+    amount: Optional[Amount] = None
+    category: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class ExpenseDiff(BaseModel):
+    # Upserts with an id update that expense, upserts without one are inserted.
+    upserts: List[Expense] = []
+    deletes: List[int] = []
+
+
+class ExpenseRecord(BaseModel):
+    id: int
+    expense_date: date
+    amount: Amount
+    category: str
+    notes: Optional[str] = None
+
+
+class ExpensePage(BaseModel):
+    items: List[ExpenseRecord]
+    next_cursor: Optional[str] = None
+
+
+class SearchHit(ExpenseRecord):
+    score: float
+
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+
+class Budget(BaseModel):
+    monthly_limit: Annotated[Amount, Field(gt=0)]
+
+
+class BudgetStatus(BaseModel):
+    category: str
+    monthly_limit: Optional[Amount] = None
+    spent: Amount
+    remaining: Optional[Amount] = None
+    over_budget: bool
+    daily_mean: float
+    daily_stddev: float
+    days: int
+
+
+class SpendingAlert(BaseModel):
+    expense_date: date
+    category: str
+    total: Amount
+    mean: float
+    std_dev: float
+    z_score: float
+
+
+class BudgetOverrun(BaseModel):
+    month: date
+    category: str
+    spent: Amount
+    monthly_limit: Amount
+
+
+class Alerts(BaseModel):
+    anomalies: List[SpendingAlert]
+    over_budget: List[BudgetOverrun]
+
+
 class DateRange(BaseModel):
     start_date: date
     end_date: date
 
 
+async def call_db(name, *args):
+    # Aggregates come from the columnar snapshot while it is current. DB_ASYNC selects the
+    # asyncio driver; otherwise the blocking db_helper runs on the threadpool.
+    if config.COLUMNAR_ENABLED and snapshot.serves(name):
+        return getattr(snapshot, name)(*args)
+    if config.DB_ASYNC and hasattr(async_db_helper, name):
+        return await getattr(async_db_helper, name)(*args)
+    return await run_in_threadpool(getattr(db_helper, name), *args)
+
+
+def sync_snapshot(version):
+    # A version the snapshot has not seen means a write it missed: serve from MySQL
+    # until a background reload catches up.
+    global _snapshot_reload
+    if not config.COLUMNAR_ENABLED or not snapshot.observe(version):
+        return
+    if _snapshot_reload is None or _snapshot_reload.done():
+        with db_router.primary_only():
+            _snapshot_reload = asyncio.create_task(run_in_threadpool(columnar.load_from_db, snapshot))
+
+
+async def after_write(expense_date):
+    result_cache.invalidate_date(expense_date)
+    if config.COLUMNAR_ENABLED:
+        await run_in_threadpool(columnar.refresh_date, snapshot, expense_date)
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def set_etag(response, etag):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(etag):
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
+
+
+async def cached(key, version, compute):
+    # `version` is the data version of the result's date range, read before computing, so
+    # the result reflects at least that version (a request reads from one replica, or the
+    # primary, throughout); entries of any other version are recomputed.
+    if not config.CACHE_ENABLED:
+        return await compute()
+    result = result_cache.get(key, version)
+    if result is None:
+        generation = result_cache.generation
+        result = await compute()
+        result_cache.set(key, result, generation, version)
+    return result
+
+
+async def cached_read(request, response, key, compute, start_date=None, end_date=None):
+    # Aggregate endpoints: ETag and cache entry follow the version of [start_date, end_date]
+    # (all data when open), so writes to other months leave both valid.
+    versions = await call_db("fetch_span_versions", (start_date, end_date))
+    sync_snapshot(versions['global'])
+    version = versions['spans'][0]
+    etag = make_etag(key, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = await cached(key, version, compute)
+    set_etag(response, etag)
+    return result
+
+@app.get("/expenses", response_model=ExpensePage)
+async def list_expenses(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                        category: Optional[str] = None, cursor: Optional[str] = None,
+                        limit: int = Query(config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX)):
+    after = None
+    if cursor:
+        try:
+            after_date, after_id = pagination.decode_cursor(cursor, 2)
+            after = (date.fromisoformat(after_date), int(after_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    # One extra row tells whether another page exists without a COUNT query.
+    rows = await call_db("fetch_expenses_page", start_date, end_date, category, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = pagination.encode_cursor(rows[-1]['expense_date'], rows[-1]['id'])
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+@app.get("/search", response_model=SearchPage)
+async def search_expenses(q: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                          category: Optional[str] = None, cursor: Optional[str] = None,
+                          limit: int = Query(config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX)):
+    try:
+        query = search.to_boolean_query(q)
+    except search.InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    after = None
+    if cursor:
+        try:
+            after_rank, after_id = pagination.decode_cursor(cursor, 2)
+            after = (int(after_rank), int(after_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    rows = await call_db("fetch_search_page", query, start_date, end_date, category, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = pagination.encode_cursor(rows[-1]['rank'], rows[-1]['id'])
+    return {"items": rows, "next_cursor": next_cursor}
+
+
 @app.get("/expenses/{expense_date}", response_model=List[Expense])
-def get_expenses(expense_date: date):
-    expenses = db_helper.fetch_expenses_for_date(expense_date)
+async def get_expenses(expense_date: date, request: Request, response: Response):
+    # Versions are read before the data, so a concurrent write can only leave the ETag behind the
+    # body (forcing a refetch next time), never ahead of it.
+    versions = await call_db("fetch_data_versions", expense_date)
+    etag = make_etag("expenses", expense_date, versions[str(expense_date)])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    expenses = await call_db("fetch_expenses_for_date", expense_date)
     if expenses is None:
         raise HTTPException(status_code=404, detail="No expenses found for the given date.")
 
+    set_etag(response, etag)
     return expenses
 
 
 @app.post("/expenses/{expense_date}")
-def add_or_update_expense(expense_date: date, expenses: List[Expense]):
+async def add_or_update_expense(expense_date: date, expenses: List[Expense]):
     try:
-        db_helper.delete_expenses_for_date(expense_date)
-        for expense in expenses:
-            db_helper.insert_expense(expense_date, expense.amount, expense.category, expense.notes)
+        await call_db("replace_expenses_for_date", expense_date, [expense.model_dump() for expense in expenses])
+        await after_write(expense_date)
         return {"message": "Expenses updated successfully"}
+    except db_helper.ArchivedYearError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update expenses: {str(e)}")
 
 
-@app.post("/analytics/")
-def get_analytics(date_range: DateRange):
-    try:
-        data = db_helper.fetch_expense_summary(date_range.start_date, date_range.end_date)
-        if not data:
-            return {"breakdown": {}, "total": 0}
-
-        total = sum(row['total'] for row in data)
-        breakdown = {
-            row['category']: {
-                "total": row['total'],
-                "percentage": (row['total'] / total) * 100 if total != 0 else 0,
-            }
-            for row in data
+@app.post("/expenses/{expense_date}/diff")
+async def apply_expense_diff(expense_date: date, diff: ExpenseDiff):
+    try:
+        result = await call_db("apply_expense_diff", expense_date,
+                               [expense.model_dump() for expense in diff.upserts], diff.deletes)
+    except db_helper.ExpenseNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except db_helper.ArchivedYearError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update expenses: {str(e)}")
+    if result["changed"]:
+        await after_write(expense_date)
+    return result
+
+
+@app.patch("/expenses/{expense_id}", response_model=ExpenseRecord)
+async def update_expense(expense_id: int, patch: ExpensePatch):
+    changes = patch.model_dump(exclude_unset=True)
+    if any(value is None for value in changes.values()):
+        raise HTTPException(status_code=400, detail="Fields cannot be set to null.")
+    try:
+        expense = await call_db("update_expense", expense_id, changes)
+    except db_helper.ArchivedYearError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update expense: {str(e)}")
+    if expense is None:
+        raise HTTPException(status_code=404, detail="Expense not found.")
+    await after_write(expense['expense_date'])
+    return expense
+
+
+@app.delete("/expenses/{expense_id}")
+async def delete_expense(expense_id: int):
+    try:
+        expense_date = await call_db("delete_expense", expense_id)
+    except db_helper.ArchivedYearError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete expense: {str(e)}")
+    if expense_date is None:
+        raise HTTPException(status_code=404, detail="Expense not found.")
+    await after_write(expense_date)
+    return {"message": "Expense deleted successfully"}
+
+
+async def build_analytics(start_date, end_date):
+    data = await call_db("fetch_expense_summary", start_date, end_date)
+    if not data:
+        return {"breakdown": {}, "total": 0}
+
+    total = sum(row['total'] for row in data)
+    breakdown = {
+        row['category']: {
+            "total": row['total'],
+            "percentage": (row['total'] / total) * 100 if total != 0 else 0,
         }
-        return {"breakdown": breakdown, "total": total}
+        for row in data
+    }
+    return {"breakdown": breakdown, "total": total}
+
+
+@app.post("/analytics/")
+async def get_analytics(date_range: DateRange, request: Request, response: Response):
+    try:
+        key = result_cache.make_key("analytics", date_range.start_date, date_range.end_date)
+        return await cached_read(
+            request, response, key, lambda: build_analytics(date_range.start_date, date_range.end_date),
+            date_range.start_date, date_range.end_date
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve analytics: {str(e)}")
 
 
 @app.get("/monthly_summary/")
-def get_monthly_summary():
+async def get_monthly_summary(request: Request, response: Response):
     try:
-        monthly_summary = db_helper.fetch_monthly_expense_summary()
+        monthly_summary = await cached_read(
+            request, response, result_cache.make_key("monthly_summary"),
+            lambda: call_db("fetch_monthly_expense_summary")
+        )
         if not monthly_summary:
             return []
 
         return monthly_summary
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve monthly summary: {str(e)}")
+
+
+async def build_timeseries(start_date, end_date, bucket, by_category):
+    rows = await call_db("fetch_bucketed_totals", start_date, end_date, bucket, by_category)
+    return {
+        "bucket": bucket,
+        "start_date": start_date,
+        "end_date": end_date,
+        "series": timeseries.fill_series(rows, start_date, end_date, bucket, by_category),
+    }
+
+
+def validate_bucket_range(start_date, end_date, bucket):
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+    if timeseries.count_buckets(start_date, end_date, bucket) > config.MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range spans more than {config.MAX_BUCKETS} {bucket} buckets.")
+
+
+@app.get("/timeseries")
+async def get_timeseries(start_date: date, end_date: date, request: Request, response: Response,
+                         bucket: Literal[timeseries.BUCKETS] = "month", by_category: bool = False):
+    validate_bucket_range(start_date, end_date, bucket)
+    try:
+        key = result_cache.make_key("timeseries", start_date, end_date, bucket, by_category)
+        return await cached_read(
+            request, response, key, lambda: build_timeseries(start_date, end_date, bucket, by_category),
+            start_date, end_date
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve time series: {str(e)}")
+
+
+async def build_trends(start_date, end_date, bucket, category, window):
+    rows = await call_db("fetch_bucketed_totals", start_date, end_date, bucket, False, category)
+    series = timeseries.fill_series(rows, start_date, end_date, bucket)
+    return {
+        "bucket": bucket,
+        "category": category,
+        "window": window,
+        "series": trends.compute_trends(series, window),
+    }
+
+
+@app.get("/trends")
+async def get_trends(start_date: date, end_date: date, request: Request, response: Response,
+                     bucket: Literal[timeseries.BUCKETS] = "month", category: Optional[str] = None,
+                     window: int = Query(3, ge=1, le=60)):
+    validate_bucket_range(start_date, end_date, bucket)
+    try:
+        key = result_cache.make_key("trends", start_date, end_date, bucket, category or "", window)
+        return await cached_read(
+            request, response, key, lambda: build_trends(start_date, end_date, bucket, category, window),
+            start_date, end_date
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve trends: {str(e)}")
+
+
+async def build_dashboard(expense_date, start_date, end_date, trends_start, trends_end, window,
+                          analytics_version, trends_version):
+    # The three reads run concurrently, each on its own pooled connection (threadpool or aiomysql).
+    # Analytics and trends share cache entries with their standalone endpoints.
+    expenses, analytics, monthly_trends = await asyncio.gather(
+        call_db("fetch_expenses_for_date", expense_date),
+        cached(result_cache.make_key("analytics", start_date, end_date), analytics_version,
+               lambda: build_analytics(start_date, end_date)),
+        cached(result_cache.make_key("trends", trends_start, trends_end, "month", "", window), trends_version,
+               lambda: build_trends(trends_start, trends_end, "month", None, window)),
+    )
+    return {
+        "expense_date": expense_date,
+        "expenses": [Expense.model_validate(row) for row in expenses or []],
+        "analytics": analytics,
+        "monthly_trends": monthly_trends,
+    }
+
+
+@app.get("/dashboard")
+async def get_dashboard(expense_date: date, start_date: date, end_date: date, request: Request, response: Response,
+                        trends_start_date: Optional[date] = None, trends_end_date: Optional[date] = None,
+                        window: int = Query(3, ge=1, le=60)):
+    # Initial state of the frontend in one round trip. The trends range defaults to the analytics range.
+    trends_start, trends_end = trends_start_date or start_date, trends_end_date or end_date
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+    validate_bucket_range(trends_start, trends_end, "month")
+
+    versions = await call_db("fetch_span_versions", (expense_date, expense_date), (start_date, end_date),
+                             (trends_start, trends_end))
+    sync_snapshot(versions['global'])
+    expenses_version, analytics_version, trends_version = versions['spans']
+    etag = make_etag("dashboard", expense_date, start_date, end_date, trends_start, trends_end, window,
+                     expenses_version, analytics_version, trends_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    try:
+        result = await build_dashboard(expense_date, start_date, end_date, trends_start, trends_end, window,
+                                       analytics_version, trends_version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load dashboard: {str(e)}")
+    set_etag(response, etag)
+    return result
+
+
+@app.post("/import")
+async def import_expenses(request: Request, format: Literal["csv", "ndjson"] = "csv",
+                          batch_size: int = Query(bulk_import.DEFAULT_BATCH_SIZE, ge=1,
+                                                  le=bulk_import.MAX_BATCH_SIZE)):
+    body = request.stream()
+
+    async def next_chunk():
+        try:
+            return await body.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def chunks():
+        # Runs on the worker thread: pull the body from the event loop one chunk at a time.
+        while (chunk := anyio.from_thread.run(next_chunk)) is not None:
+            yield chunk
+
+    try:
+        report = await run_in_threadpool(bulk_import.import_chunks, chunks(), format, batch_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import expenses: {str(e)}")
+    finally:
+        if config.CACHE_ENABLED:
+            result_cache.clear()
+    return report
+
+
+@app.get("/budgets", response_model=List[BudgetStatus])
+async def get_budgets(month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$")):
+    # Spending of each category with a budget or with expenses in the month (default: this month).
+    try:
+        first_day = date.fromisoformat(f"{month}-01") if month else date.today().replace(day=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month.")
+    try:
+        return await call_db("fetch_budget_status", first_day)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve budgets: {str(e)}")
+
+
+@app.put("/budgets/{category}")
+async def set_budget(category: str, budget: Budget):
+    try:
+        await call_db("set_budget", category, budget.monthly_limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to set budget: {str(e)}")
+    return {"message": "Budget saved successfully"}
+
+
+@app.delete("/budgets/{category}")
+async def delete_budget(category: str):
+    try:
+        deleted = await call_db("delete_budget", category)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete budget: {str(e)}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Budget not found.")
+    return {"message": "Budget deleted successfully"}
+
+
+@app.get("/alerts", response_model=Alerts)
+async def get_alerts(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                     category: Optional[str] = None):
+    # Unusually high spending days and months over budget; the default range is the last 30 days.
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=30)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+    try:
+        return await call_db("fetch_alerts", start_date, end_date, category)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve alerts: {str(e)}")
+
+
+@app.get("/export")
+def export_expenses(start_date: date, end_date: date, category: Optional[str] = None,
+                    format: Literal["csv", "ndjson", "parquet"] = "csv"):
+    if format == "parquet" and export.pa is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server.")
+
+    batches = db_helper.stream_expenses(start_date, end_date, category, config.EXPORT_BATCH_SIZE)
+    filename = f"expenses_{start_date}_{end_date}.{format}"
+    return StreamingResponse(
+        export.stream(format, batches),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/pool_stats/")
+def get_pool_stats():
+    stats = db_helper.get_pool_stats()
+    if config.DB_ASYNC:
+        stats["async"] = async_db_helper.get_pool_stats()
+    return stats
+
+
+@app.get("/cache_stats/")
+def get_cache_stats():
+    return result_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+
+BUCKETS = ("day", "week", "month", "quarter", "year")
+
+# Start date of the bucket containing expense_date, evaluated by MySQL. Weeks start on Monday.
+BUCKET_SQL = {
+    "day": "expense_date",
+    "week": "DATE_SUB(expense_date, INTERVAL WEEKDAY(expense_date) DAY)",
+    "month": "DATE_SUB(expense_date, INTERVAL DAYOFMONTH(expense_date) - 1 DAY)",
+    "quarter": "MAKEDATE(YEAR(expense_date), 1) + INTERVAL QUARTER(expense_date) - 1 QUARTER",
+    "year": "MAKEDATE(YEAR(expense_date), 1)",
+}
+
+
+def bucket_start(day, bucket):
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    if bucket == "year":
+        return date(day.year, 1, 1)
+    raise ValueError(f"unknown bucket {bucket!r}")
+
+
+def next_bucket(start, bucket):
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "week":
+        return start + timedelta(days=7)
+    months = {"month": 1, "quarter": 3, "year": 12}[bucket]
+    month_index = start.year * 12 + start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def iter_buckets(start_date, end_date, bucket):
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        yield current
+        current = next_bucket(current, bucket)
+
+
+def count_buckets(start_date, end_date, bucket):
+    if bucket == "day":
+        return (end_date - start_date).days + 1
+    if bucket == "week":
+        return (bucket_start(end_date, "week") - bucket_start(start_date, "week")).days // 7 + 1
+    months = {"month": 1, "quarter": 3, "year": 12}[bucket]
+    first, last = bucket_start(start_date, bucket), bucket_start(end_date, bucket)
+    return ((last.year - first.year) * 12 + last.month - first.month) // months + 1
+
+
+def bucket_label(start, bucket):
+    if bucket == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == "month":
+        return start.strftime("%b %Y")
+    if bucket == "quarter":
+        return f"{start.year} Q{(start.month - 1) // 3 + 1}"
+    if bucket == "year":
+        return str(start.year)
+    return start.isoformat()
+
+
+def fill_series(rows, start_date, end_date, bucket, by_category=False):
+    """Expand bucketed SQL rows into a dense, ascending series with zero totals for
+    empty buckets (and, when split by category, for every category seen in the range)."""
+    totals = {}
+    categories = set()
+    for row in rows:
+        start = bucket_start(row['bucket'], bucket)
+        key = (start, row['category']) if by_category else start
+        totals[key] = row
+        if by_category:
+            categories.add(row['category'])
+
+    series = []
+    for start in iter_buckets(start_date, end_date, bucket):
+        for category in sorted(categories) if by_category else [None]:
+            row = totals.get((start, category) if by_category else start)
+            point = {
+                "period": start,
+                "label": bucket_label(start, bucket),
+                "total": row['total'] if row else Decimal(0),
+                "expense_count": int(row['expense_count']) if row else 0,
+            }
+            if by_category:
+                point["category"] = category
+            series.append(point)
+    return series
@@ -0,0 +1,27 @@
+from collections import deque
+from decimal import Decimal
+
+
+def compute_trends(series, window=3):
+    """Add period-over-period change and an N-period rolling average to a dense,
+    ascending series (as produced by timeseries.fill_series) in a single pass."""
+    trends = []
+    recent = deque(maxlen=window)
+    running = Decimal(0)
+    previous = None
+    for point in series:
+        total = Decimal(point['total'])
+        if len(recent) == window:
+            running -= recent[0]
+        recent.append(total)
+        running += total
+
+        change = None if previous is None else total - previous
+        trends.append({
+            **point,
+            "change": change,
+            "change_pct": float(change / previous * 100) if previous else None,
+            "rolling_avg": running / window if len(recent) == window else None,
+        })
+        previous = total
+    return trends
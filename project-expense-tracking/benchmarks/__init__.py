@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Same layout as tests/conftest.py: backend modules import each other by bare name.
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
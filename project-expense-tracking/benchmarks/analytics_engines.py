@@ -0,0 +1,91 @@
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from benchmarks import datagen, loadgen
+
+
+QUERY_KINDS = ("summary", "monthly_summary", "timeseries", "timeseries_by_category")
+
+
+def random_query(rng, start_date, end_date):
+    kind = rng.choice(QUERY_KINDS)
+    first = start_date + timedelta(days=rng.randrange((end_date - start_date).days + 1))
+    last = min(first + timedelta(days=rng.choice([7, 30, 90, 365, 3650])), end_date)
+    if kind == "summary":
+        return kind, "fetch_expense_summary", (first, last)
+    if kind == "monthly_summary":
+        return kind, "fetch_monthly_expense_summary", ()
+    bucket = rng.choice(["day", "week", "month", "quarter", "year"])
+    return kind, "fetch_bucketed_totals", (first, last, bucket, kind == "timeseries_by_category")
+
+
+def synthetic_rollup(start_date, days, rows_per_day, seed):
+    # What expense_daily_rollup would hold after datagen loaded the same rows.
+    totals = defaultdict(lambda: [0, 0])
+    for expense_date, amount, category, _ in datagen.generate_rows(start_date, days, rows_per_day, seed):
+        entry = totals[(expense_date, category)]
+        entry[0] += amount
+        entry[1] += 1
+    return [{"expense_date": d, "category": c, "total": t, "expense_count": n} for (d, c), (t, n) in totals.items()]
+
+
+def time_engine(engine, queries):
+    latencies = defaultdict(list)
+    for kind, name, args in queries:
+        started = time.perf_counter()
+        getattr(engine, name)(*args)
+        latencies[kind].append(time.perf_counter() - started)
+    return {kind: loadgen.summarize(values, 0) for kind, values in sorted(latencies.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the columnar snapshot with MySQL on the aggregate queries.")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--synthetic-years", type=int,
+                        help="time the snapshot alone on generated data, without MySQL")
+    parser.add_argument("--rows-per-day", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    import columnar
+    import db_helper
+
+    snapshot = columnar.ColumnarSnapshot()
+    started = time.perf_counter()
+    if args.synthetic_years:
+        start_date = date(date.today().year - args.synthetic_years, 1, 1)
+        days = args.synthetic_years * 365
+        snapshot.load(synthetic_rollup(start_date, days, args.rows_per_day, args.seed), version=0)
+        end_date = start_date + timedelta(days=days - 1)
+    else:
+        columnar.load_from_db(snapshot)
+        ordinals = snapshot._columns.ordinals
+        if not len(ordinals):
+            parser.error("expense_daily_rollup is empty; load data with benchmarks.datagen first")
+        start_date, end_date = date.fromordinal(int(ordinals[0])), date.fromordinal(int(ordinals[-1]))
+    load_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed)
+    queries = [random_query(rng, start_date, end_date) for _ in range(args.queries)]
+    report = {
+        "commit": loadgen._git_commit(),
+        "rollup_rows": len(snapshot._columns.ordinals),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "snapshot_load_s": round(load_seconds, 3),
+        "columnar": time_engine(snapshot, queries),
+    }
+    if not args.synthetic_years:
+        report["mysql"] = time_engine(db_helper, queries)
+        report["mismatches"] = columnar.compare_with_sql(snapshot, start_date, end_date)
+    print(json.dumps(report, indent=2))
+    return 1 if report.get("mismatches") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+
+# (category, share of non-rent rows, median amount, lognormal sigma, sample notes)
+CATEGORY_PROFILES = [
+    ("Food", 0.50, 14.0, 0.6, ["Groceries", "Lunch", "Coffee", "Dinner out", "Takeaway"]),
+    ("Shopping", 0.20, 45.0, 0.9, ["Clothes", "Electronics", "Household", "Gift"]),
+    ("Entertainment", 0.15, 25.0, 0.7, ["Movie", "Concert", "Streaming", "Games"]),
+    ("Other", 0.15, 20.0, 1.0, ["Taxi", "Pharmacy", "Haircut", "Repairs"]),
+]
+RENT_AMOUNT = (1200, 2500)
+# Food and entertainment spending goes up at the weekend.
+WEEKEND_FACTOR = {"Food": 1.3, "Entertainment": 1.6}
+
+
+def _amount(rng, median, sigma):
+    return Decimal(f"{rng.lognormvariate(0, sigma) * median:.2f}").max(Decimal("0.50"))
+
+
+def generate_rows(start_date, days, rows_per_day, seed=0):
+    """Yield ``(expense_date, amount, category, notes)`` tuples, ``rows_per_day`` per day.
+    The first row of each month is the rent; the same seed gives the same rows."""
+    rng = random.Random(seed)
+    categories = [profile[0] for profile in CATEGORY_PROFILES]
+    weights = [profile[1] for profile in CATEGORY_PROFILES]
+    profiles = {profile[0]: profile for profile in CATEGORY_PROFILES}
+    rent = rng.randrange(*RENT_AMOUNT)
+
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        count = rows_per_day
+        if day.day == 1:
+            yield day, Decimal(rent).quantize(Decimal("0.01")), "Rent", f"Rent {day:%B %Y}"
+            count -= 1
+        weekend = day.weekday() >= 5
+        for category in rng.choices(categories, weights, k=max(count, 0)):
+            _, _, median, sigma, notes = profiles[category]
+            if weekend:
+                median *= WEEKEND_FACTOR.get(category, 1.0)
+            yield day, _amount(rng, median, sigma), category, rng.choice(notes)
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load(rows, batch_size, progress=None):
+    """Insert through ``db_helper.insert_expenses_batch`` so the rollups and data
+    versions stay consistent with the loaded rows."""
+    import db_helper
+
+    loaded = 0
+    for batch in batched(rows, batch_size):
+        db_helper.insert_expenses_batch(batch)
+        loaded += len(batch)
+        if progress:
+            progress(loaded)
+    return loaded
+
+
+def write_csv(rows, path):
+    # Same columns as bulk_import, so the file can be replayed through POST /import.
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["expense_date", "amount", "category", "notes"])
+        for expense_date, amount, category, notes in rows:
+            writer.writerow([expense_date.isoformat(), amount, category, notes])
+            written += 1
+    return written
+
+
+def add_years(day, years):
+    # Feb 29 maps to Feb 28 in a year that has none.
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic expenses for benchmarking.")
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--rows-per-day", type=int, default=100)
+    parser.add_argument("--start-date", type=date.fromisoformat,
+                        help="first day (defaults to January 1st, --years years ago)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--output", help="write a CSV file instead of loading the database")
+    parser.add_argument("--no-migrate", action="store_true", help="do not apply pending migrations first")
+    args = parser.parse_args(argv)
+
+    start_date = args.start_date or date(date.today().year - args.years, 1, 1)
+    end_date = add_years(start_date, args.years)
+    days = (end_date - start_date).days
+    rows = generate_rows(start_date, days, args.rows_per_day, args.seed)
+
+    started = time.perf_counter()
+    if args.output:
+        count = write_csv(rows, args.output)
+    else:
+        if not args.no_migrate:
+            import migrate
+            migrate.apply_migrations()
+
+        def progress(loaded):
+            print(f"{loaded} rows loaded", file=sys.stderr)
+
+        count = load(rows, args.batch_size, progress)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "rows": count,
+        "start_date": start_date.isoformat(),
+        "end_date": (end_date - timedelta(days=1)).isoformat(),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(count / elapsed) if elapsed else None,
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
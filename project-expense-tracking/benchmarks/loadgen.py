@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+
+from benchmarks import datagen
+
+
+DEFAULT_MIX = "get_expenses=60,analytics=25,monthly_summary=10,update_expenses=5"
+
+
+def _random_day(rng, start_date, end_date):
+    return start_date + timedelta(days=rng.randrange((end_date - start_date).days + 1))
+
+
+def get_expenses(client, rng, start_date, end_date):
+    return client.get(f"/expenses/{_random_day(rng, start_date, end_date)}")
+
+
+def update_expenses(client, rng, start_date, end_date):
+    day = _random_day(rng, start_date, end_date)
+    rows = datagen.generate_rows(day, 1, rng.randint(1, 10), seed=rng.random())
+    payload = [{"amount": float(amount), "category": category, "notes": notes}
+               for _, amount, category, notes in rows]
+    return client.post(f"/expenses/{day}", json=payload)
+
+
+def analytics(client, rng, start_date, end_date):
+    first = _random_day(rng, start_date, end_date)
+    last = min(first + timedelta(days=rng.choice([7, 30, 90, 365])), end_date)
+    return client.post("/analytics/", json={"start_date": str(first), "end_date": str(last)})
+
+
+def monthly_summary(client, rng, start_date, end_date):
+    return client.get("/monthly_summary/")
+
+
+OPERATIONS = {
+    "get_expenses": get_expenses,
+    "update_expenses": update_expenses,
+    "analytics": analytics,
+    "monthly_summary": monthly_summary,
+}
+
+
+def parse_mix(value):
+    # "get_expenses=60,analytics=40" -> {"get_expenses": 60.0, "analytics": 40.0}
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}, expected one of {sorted(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("the mix needs at least one operation with a positive weight")
+    return mix
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile over an already sorted list.
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors):
+    values = sorted(latencies)
+    ms = lambda seconds: None if seconds is None else round(seconds * 1000, 2)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+
+
+async def run(client, mix, users, duration, start_date, end_date, seed=0, warmup=0.0):
+    """Drive ``users`` concurrent clients through the weighted ``mix`` for ``duration``
+    seconds (after ``warmup`` seconds that are not measured) and return the report."""
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    statuses = {}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def user(index):
+        rng = random.Random(f"{seed}:{index}")
+        while loop.time() < stop_at:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await OPERATIONS[name](client, rng, start_date, end_date)
+                status = str(response.status_code)
+                failed = response.status_code >= 400
+            except httpx.HTTPError as e:
+                status, failed = type(e).__name__, True
+            elapsed = time.perf_counter() - started
+            if loop.time() < measure_from:
+                continue
+            latencies[name].append(elapsed)
+            errors[name] += failed
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = loop.time()
+    await asyncio.gather(*(user(index) for index in range(users)))
+    measured = max(loop.time() - started - warmup, 1e-9)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    total = summarize(all_latencies, sum(errors.values()))
+    total["throughput_rps"] = round(len(all_latencies) / measured, 2)
+    return {
+        "duration_s": round(measured, 3),
+        "statuses": statuses,
+        "total": total,
+        "endpoints": {name: summarize(latencies[name], errors[name]) for name in names},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _main(args):
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    timeout = httpx.Timeout(args.timeout)
+    if args.in_process:
+        # Runs the app inside this process: no uvicorn, no network, same database.
+        import server
+        transport = httpx.ASGITransport(app=server.app)
+        async with server.app.router.lifespan_context(server.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                         limits=limits, timeout=timeout) as client:
+                report = await run(client, mix, args.users, args.duration,
+                                   args.start_date, args.end_date, args.seed, args.warmup)
+    else:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            report = await run(client, mix, args.users, args.duration,
+                               args.start_date, args.end_date, args.seed, args.warmup)
+
+    report = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": "in-process" if args.in_process else args.url,
+        "users": args.users,
+        "mix": mix,
+        "start_date": args.start_date.isoformat(),
+        "end_date": args.end_date.isoformat(),
+        **report,
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a weighted mix of API calls and report latency.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true",
+                        help="call the FastAPI app in this process instead of over HTTP")
+    parser.add_argument("--users", type=int, default=50, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(date.today().year - 1, 1, 1))
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+    if args.end_date < args.start_date:
+        parser.error("--end-date must not be before --start-date")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = asyncio.run(_main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -43,6 +43,26 @@ LOCK TABLES `expenses` WRITE;
 INSERT INTO `expenses` VALUES (3,'2024-08-02',50,'Entertainment','Movie tickets'),(4,'2024-08-02',150,'Shopping','New shoes'),(5,'2024-08-03',100,'Food','Dinner at a restaurant'),(11,'2024-08-02',400,'Food','Groceries for the week'),(12,'2024-08-02',80,'Entertainment','Concert tickets'),(13,'2024-08-02',100,'Shopping','Clothes'),(14,'2024-08-02',50,'Other','Gasoline'),(15,'2024-08-03',60,'Food','Dinner at a restaurant'),(16,'2024-08-03',20,'Entertainment','Video rental'),(17,'2024-08-03',120,'Shopping','Gadgets'),(18,'2024-08-03',15,'Other','Coffee'),(19,'2024-08-04',25,'Food','Lunch'),(20,'2024-08-04',200,'Shopping','Home supplies'),(21,'2024-08-04',10,'Other','Parking'),(22,'2024-08-05',350,'Rent','Shared rent payment'),(23,'2024-08-05',40,'Food','Snacks'),(24,'2024-08-05',75,'Entertainment','Theater tickets'),(25,'2024-08-05',100,'Shopping','Books'),(26,'2024-08-05',15,'Other','Miscellaneous'),(27,'2024-08-06',30,'Food','Breakfast'),(28,'2024-08-06',100,'Shopping','Shoes'),(29,'2024-08-06',80,'Entertainment','Movies'),(30,'2024-08-06',15,'Other','Public transport'),(31,'2024-09-01',1200,'Rent','Monthly rent payment'),(32,'2024-09-01',300,'Food','Groceries for the week'),(33,'2024-09-01',50,'Entertainment','Movie tickets'),(34,'2024-09-01',150,'Shopping','New shoes'),(35,'2024-09-01',20,'Other','Bus fare'),(36,'2024-09-02',400,'Food','Groceries for the week'),(37,'2024-09-02',80,'Entertainment','Concert tickets'),(38,'2024-09-02',100,'Shopping','Clothes'),(39,'2024-09-02',50,'Other','Gasoline'),(40,'2024-09-03',60,'Food','Dinner at a restaurant'),(41,'2024-09-03',20,'Entertainment','Video rental'),(42,'2024-09-03',120,'Shopping','Gadgets'),(43,'2024-09-03',15,'Other','Coffee'),(44,'2024-09-04',25,'Food','Lunch'),(45,'2024-09-04',200,'Shopping','Home supplies'),(46,'2024-09-04',10,'Other','Parking'),(47,'2024-09-05',350,'Rent','Shared rent payment'),(48,'2024-09-05',40,'Food','Snacks'),(49,'2024-09-05',75,'Entertainment','Theater tickets'),(50,'2024-09-05',100,'Shopping','Books'),(51,'2024-09-05',15,'Other','Miscellaneous'),(52,'2024-09-30',1000,'Rent','Monthly rent payment'),(53,'2024-09-30',250,'Food','Groceries for the week'),(54,'2024-09-30',40,'Entertainment','Cinema tickets'),(55,'2024-09-30',100,'Shopping','Clothes'),(56,'2024-09-30',20,'Other','Public transport'),(62,'2024-08-15',10,'Shopping','Bought potatoes'),(63,'2024-08-01',1227,'Rent','Monthly rent payment'),(64,'2024-08-01',300,'Food','Groceries for the week'),(65,'2024-08-01',1200,'Rent','Monthly rent payment'),(66,'2024-08-01',300,'Food','Groceries for the week');
 /*!40000 ALTER TABLE `expenses` ENABLE KEYS */;
 UNLOCK TABLES;
+
+--
+-- Table structure for table `expense_daily_rollup`
+--
+-- Per-day, per-category totals used by the analytics endpoints. Maintained by
+-- db_helper in the same transaction as every write to `expenses`; rebuild with
+-- `python backend/rollups.py rebuild`.
+--
+
+DROP TABLE IF EXISTS `expense_daily_rollup`;
+CREATE TABLE `expense_daily_rollup` (
+  `expense_date` date NOT NULL,
+  `category` varchar(255) NOT NULL,
+  `total` double NOT NULL,
+  `expense_count` int NOT NULL,
+  PRIMARY KEY (`expense_date`,`category`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT INTO `expense_daily_rollup` (`expense_date`, `category`, `total`, `expense_count`)
+SELECT `expense_date`, `category`, SUM(`amount`), COUNT(*) FROM `expenses` GROUP BY `expense_date`, `category`;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
 
 /*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import datetime
 import requests
+import api_client
 
 # Enhanced CSS with more modern styling
 custom_css = """
@@ -76,9 +77,29 @@ custom_css = """
 </style>
 """
 
-API_URL = "http://localhost:8000"
-
-
+DEFAULT_DATE = datetime(2024, 8, 1).date()
+
+
+def changed_expenses(rows):
+    """Turn the form rows into the upserts and deletes of a /diff request. Unchanged
+    stored rows are left out, and a stored row set to 0 is deleted."""
+    upserts, deletes = [], []
+    for row in rows:
+        expense = {'id': row['id'], 'amount': row['amount'], 'category': row['category'], 'notes': row['notes']}
+        if row['original'] is None:
+            if row['amount'] > 0:
+                upserts.append(expense)
+            continue
+        original_amount, original_category, original_notes = row['original']
+        if row['amount'] <= 0:
+            deletes.append(row['id'])
+        elif (round(row['amount'], 2), row['category'], row['notes']) != \
+                (round(original_amount, 2), original_category, original_notes):
+            upserts.append(expense)
+    return upserts, deletes
+
+
+@st.fragment
 def add_update_tab():
     st.markdown(custom_css, unsafe_allow_html=True)
 
@@ -87,16 +108,14 @@ def add_update_tab():
     with col1:
         selected_date = st.date_input(
             "Select Date",
-            datetime(2024, 8, 1),
+            DEFAULT_DATE,
             help="Choose the date for expense entry"
         )
 
     # Fetch existing expenses
     try:
         with st.spinner("Loading existing expenses..."):
-            response = requests.get(f"{API_URL}/expenses/{selected_date}")
-            response.raise_for_status()
-            existing_expenses = response.json()
+            existing_expenses = api_client.get_expenses(selected_date)
     except requests.exceptions.RequestException:
         st.warning("⚠️ Could not load existing expenses. Starting with empty form.")
         existing_expenses = []
@@ -124,11 +143,12 @@ def add_update_tab():
             amount = 0.0
             category = "Shopping"
             notes = ""
+            existing = existing_expenses[i] if i < len(existing_expenses) else None
 
-            if i < len(existing_expenses):
-                amount = existing_expenses[i].get('amount', 0.0)
-                category = existing_expenses[i].get("category", "Shopping")
-                notes = existing_expenses[i].get("notes", "")
+            if existing:
+                amount = existing.get('amount', 0.0)
+                category = existing.get("category", "Shopping")
+                notes = existing.get("notes") or ""
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -161,9 +181,11 @@ def add_update_tab():
                 )
 
             expenses.append({
+                'id': existing.get('id') if existing else None,
                 'amount': amount_input,
                 'category': category_input,
-                'notes': notes_input
+                'notes': notes_input,
+                'original': (amount, category, notes) if existing else None
             })
 
         # Display total
@@ -174,21 +196,23 @@ def add_update_tab():
 
         if submit_button:
             try:
-                filtered_expenses = [exp for exp in expenses if exp['amount'] > 0]
-
-                with st.spinner("Saving expenses..."):
-                    response = requests.post(
-                        f"{API_URL}/expenses/{selected_date}",
-                        json=filtered_expenses
-                    )
-                    response.raise_for_status()
-
-                st.success("✅ Expenses saved successfully!")
-
-                # Show summary of saved expenses
-                st.markdown("### Saved Expenses Summary")
-                for expense in filtered_expenses:
-                    st.markdown(f"- ${expense['amount']:,.2f} ({expense['category']}): {expense['notes']}")
+                upserts, deletes = changed_expenses(expenses)
+
+                if not upserts and not deletes:
+                    st.info("No changes to save.")
+                else:
+                    with st.spinner("Saving expenses..."):
+                        api_client.save_expense_changes(selected_date, upserts, deletes)
+
+                    st.success("✅ Expenses saved successfully!")
+
+                    # Show summary of saved expenses
+                    st.markdown("### Saved Changes Summary")
+                    for expense in upserts:
+                        action = "Updated" if expense['id'] else "Added"
+                        st.markdown(f"- {action} ${expense['amount']:,.2f} ({expense['category']}): {expense['notes']}")
+                    if deletes:
+                        st.markdown(f"- Removed {len(deletes)} expense(s)")
 
             except requests.exceptions.RequestException as e:
                 st.error(f"⚠️ Failed to save expenses: {str(e)}")
\ No newline at end of file
@@ -1,12 +1,15 @@
 import streamlit as st
 from datetime import datetime
 import requests
+import api_client
 import pandas as pd
 import plotly.express as px
 
-API_URL = "http://localhost:8000"
+DEFAULT_START_DATE = datetime(2024, 8, 1).date()
+DEFAULT_END_DATE = datetime(2024, 8, 5).date()
 
 
+@st.fragment
 def analytics_category_tab():
     # Set solid background color for the whole app
     background_color = "#1a1a1d"  # Dark background color
@@ -64,14 +67,14 @@ def analytics_category_tab():
         with col1:
             start_date = st.date_input(
                 "Start Date",
-                datetime(2024, 8, 1),
+                DEFAULT_START_DATE,
                 help="Select the start date for analysis"
             )
 
         with col2:
             end_date = st.date_input(
                 "End Date",
-                datetime(2024, 8, 5),
+                DEFAULT_END_DATE,
                 help="Select the end date for analysis"
             )
 
@@ -85,14 +88,7 @@ def analytics_category_tab():
     if analyze_button:
         try:
             with st.spinner("Analyzing expenses..."):
-                payload = {
-                    "start_date": start_date.strftime("%Y-%m-%d"),
-                    "end_date": end_date.strftime("%Y-%m-%d")
-                }
-
-                response = requests.post(f"{API_URL}/analytics/", json=payload)
-                response.raise_for_status()
-                data = response.json()
+                data = api_client.get_analytics(start_date, end_date)
 
                 # Extract data from the "breakdown" structure
                 breakdown_data = data["breakdown"]
@@ -1,27 +1,48 @@
 import streamlit as st
-from datetime import datetime
+from datetime import date
 import requests
+import api_client
 import pandas as pd
 import plotly.express as px
 
-API_URL = "http://localhost:8000"
 
+def default_range():
+    today = date.today()
+    return date(today.year - 1, 1, 1), today
 
+
+@st.fragment
 def analytics_months_tab():
+    default_start, default_end = default_range()
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input(
+            "From",
+            default_start,
+            help="First month to include",
+            key="months_start_date"
+        )
+    with col2:
+        end_date = st.date_input(
+            "To",
+            default_end,
+            help="Last month to include",
+            key="months_end_date"
+        )
+
     try:
         with st.spinner("Loading monthly data..."):
-            response = requests.get(f"{API_URL}/monthly_summary/")
-            response.raise_for_status()
-            monthly_summary = response.json()
+            # One point per calendar month across years (empty months are 0), with the
+            # month-over-month change and 3-month average already computed by the backend.
+            trends = api_client.get_monthly_trends(start_date, end_date)
 
-            df = pd.DataFrame(monthly_summary)
+            df = pd.DataFrame(trends["series"])
             df.rename(columns={
-                "expense_month": "Month Number",
-                "month_name": "Month Name",
+                "period": "Month Start",
+                "label": "Month Name",
                 "total": "Total"
             }, inplace=True)
-            df_sorted = df.sort_values(by="Month Number", ascending=False)
-            df_sorted.set_index("Month Number", inplace=True)
+            df_sorted = df.set_index("Month Start")
 
             # Display summary metrics
             col1, col2, col3 = st.columns(3)
@@ -70,29 +91,19 @@ def analytics_months_tab():
 
             st.plotly_chart(fig, use_container_width=True)
 
-            # Show trend analysis
+            # Show trend analysis; formatting is done by the column config, not per cell.
             st.markdown("### Monthly Trend Analysis")
-            df_sorted['MoM Change'] = df_sorted['Total'].pct_change() * 100
-            df_sorted['3-Month Avg'] = df_sorted['Total'].rolling(3).mean()
-
-            # Create analysis table
-            analysis_df = df_sorted.copy()
-            analysis_df['Total'] = analysis_df['Total'].apply(lambda x: f"${x:,.2f}")
-            analysis_df['MoM Change'] = analysis_df['MoM Change'].apply(
-                lambda x: f"{x:+.1f}%" if pd.notnull(x) else "N/A")
-            analysis_df['3-Month Avg'] = analysis_df['3-Month Avg'].apply(
-                lambda x: f"${x:,.2f}" if pd.notnull(x) else "N/A")
-
-            # Style the table
-            styled_df = pd.DataFrame({
-                'Month': analysis_df.index,
-                'Month Name': analysis_df['Month Name'],
-                'Total Expenses': analysis_df['Total'],
-                'Month-over-Month Change': analysis_df['MoM Change'],
-                'Three Month Average': analysis_df['3-Month Avg']
-            })
-
-            st.table(styled_df)
+            st.dataframe(
+                df_sorted[["Month Name", "Total", "change_pct", "rolling_avg"]],
+                column_config={
+                    "Month Name": st.column_config.TextColumn("Month"),
+                    "Total": st.column_config.NumberColumn("Total Expenses", format="$%.2f"),
+                    "change_pct": st.column_config.NumberColumn("Month-over-Month Change", format="%+.1f%%"),
+                    "rolling_avg": st.column_config.NumberColumn("Three Month Average", format="$%.2f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
 
     except requests.exceptions.RequestException as e:
         st.error(f"⚠️ Failed to fetch monthly summary: {str(e)}")
@@ -0,0 +1,201 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.getenv("EXPENSE_API_URL", "http://localhost:8000").rstrip("/")
+# (connect, read) seconds: a stopped backend fails fast, a slow query gets longer.
+TIMEOUT = (float(os.getenv("EXPENSE_API_CONNECT_TIMEOUT", 3.05)), float(os.getenv("EXPENSE_API_READ_TIMEOUT", 30)))
+RETRIES = int(os.getenv("EXPENSE_API_RETRIES", 3))
+
+# Seconds a cached response is used without asking the backend; after that it is
+# revalidated with its ETag. Saves made through this client invalidate immediately.
+CACHE_TTL = float(os.getenv("EXPENSE_API_CACHE_TTL", 60))
+MAX_ENTRIES = 256
+
+
+@st.cache_resource
+def get_session():
+    """One keep-alive session per Streamlit server process, shared by all reruns and tabs.
+    Only GETs are retried; a retried POST could save the same expenses twice."""
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def request(method, path, payload=None, params=None, headers=None):
+    response = get_session().request(method, f"{API_URL}{path}", json=payload, params=params,
+                                     headers=headers, timeout=TIMEOUT)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
+class ResponseCache:
+    """Process-wide store of decoded responses, shared by every browser session.
+
+    An entry younger than ``ttl`` is served without contacting the backend; an older one
+    is revalidated with its ETag. Each entry remembers the expense dates it depends on, so
+    a save can drop exactly the entries that include the saved date."""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, etag, data, span):
+        with self._lock:
+            self._entries[key] = {"etag": etag, "data": data, "span": span,
+                                  "expires_at": time.monotonic() + self.ttl}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["expires_at"] = time.monotonic() + self.ttl
+
+    def invalidate_date(self, expense_date):
+        # Entries without a span (e.g. the all-time monthly summary) cover every date.
+        day = str(expense_date)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if entry["span"] is None or entry["span"][0] <= day <= entry["span"][1]]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@st.cache_resource
+def get_cache():
+    return ResponseCache(CACHE_TTL, MAX_ENTRIES)
+
+
+_DATE_PATH = re.compile(r"^/expenses/(\d{4}-\d{2}-\d{2})$")
+
+
+def _date_span(path, payload, params):
+    """ISO (start, end) dates a response depends on, or None when it spans all data."""
+    match = _DATE_PATH.match(path)
+    if match:
+        return match.group(1), match.group(1)
+    for source in (params, payload):
+        if isinstance(source, dict) and "start_date" in source and "end_date" in source:
+            return str(source["start_date"]), str(source["end_date"])
+    return None
+
+
+def _key(method, path, payload=None, params=None):
+    return f"{method} {path} {json.dumps(params, sort_keys=True)} {json.dumps(payload, sort_keys=True)}"
+
+
+def fetch_json(method, path, payload=None, params=None):
+    """Return the decoded response, from the shared cache while it is fresh. Stale
+    entries are revalidated with ``If-None-Match`` and reused on 304 Not Modified."""
+    cache = get_cache()
+    key = _key(method, path, payload, params)
+    cached = cache.get(key)
+    if cached and cached["expires_at"] > time.monotonic():
+        return cached["data"]
+    headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+
+    response = request(method, path, payload, params, headers)
+    if response.status_code == 304:
+        if cached:
+            cache.touch(key)
+            return cached["data"]
+        # A 304 we did not ask for; retry unconditionally.
+        response = request(method, path, payload, params)
+
+    data = response.json()
+    cache.set(key, response.headers.get("ETag"), data, _date_span(path, payload, params))
+    return data
+
+
+def save_expense_changes(expense_date, upserts, deletes):
+    """Send only the changed rows of a date: upserts with an id update that expense,
+    upserts without one are inserted, and deletes lists ids to remove."""
+    result = request("POST", f"/expenses/{expense_date}/diff", {"upserts": upserts, "deletes": deletes}).json()
+    if result["changed"]:
+        get_cache().invalidate_date(expense_date)
+    return result
+
+
+# Requests made by the views. load_dashboard seeds the cache under these same keys.
+def _expenses_request(expense_date):
+    return "GET", f"/expenses/{expense_date}", None, None
+
+
+def _analytics_request(start_date, end_date):
+    return "POST", "/analytics/", {"start_date": str(start_date), "end_date": str(end_date)}, None
+
+
+def _trends_request(start_date, end_date, window=3):
+    params = {"start_date": str(start_date), "end_date": str(end_date), "bucket": "month", "window": window}
+    return "GET", "/trends", None, params
+
+
+def get_expenses(expense_date):
+    return fetch_json(*_expenses_request(expense_date))
+
+
+def get_analytics(start_date, end_date):
+    return fetch_json(*_analytics_request(start_date, end_date))
+
+
+def get_monthly_trends(start_date, end_date, window=3):
+    return fetch_json(*_trends_request(start_date, end_date, window))
+
+
+def load_dashboard(expense_date, start_date, end_date, trends_start_date, trends_end_date, window=3):
+    """Fetch the initial data of all three views with one /dashboard call and store each
+    part as if its own endpoint had been called. Skipped when all parts are still fresh."""
+    cache = get_cache()
+    parts = {
+        "expenses": _expenses_request(expense_date),
+        "analytics": _analytics_request(start_date, end_date),
+        "monthly_trends": _trends_request(trends_start_date, trends_end_date, window),
+    }
+    now = time.monotonic()
+    if all((entry := cache.get(_key(*request))) and entry["expires_at"] > now for request in parts.values()):
+        return
+
+    # Not stored itself: its parts are, each with its own date span, so a save drops exactly
+    # the parts it affects and the next call refetches the dashboard.
+    dashboard = request("GET", "/dashboard", params={
+        "expense_date": str(expense_date),
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "trends_start_date": str(trends_start_date),
+        "trends_end_date": str(trends_end_date),
+        "window": window,
+    }).json()
+    for name, (method, path, payload, params) in parts.items():
+        cache.set(_key(method, path, payload, params), None, dashboard[name], _date_span(path, payload, params))
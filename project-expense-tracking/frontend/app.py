@@ -1,4 +1,9 @@
 import streamlit as st
+import requests
+import api_client
+import add_update
+import analytics_by_category
+import analytics_by_months
 from add_update import add_update_tab
 from analytics_by_category import analytics_category_tab
 from analytics_by_months import analytics_months_tab
@@ -34,23 +39,22 @@ custom_css = """
         margin-bottom: 2rem;
     }
 
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
+    /* View selector styling */
+    .stRadio [role="radiogroup"] {
         gap: 24px;
         padding: 0.5rem;
         background-color: var(--background-white);
         border-radius: 10px;
     }
 
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        padding: 0 24px;
+    .stRadio [role="radiogroup"] label {
+        padding: 0.75rem 24px;
         color: var(--secondary-color);
         background-color: var(--background-light);
         border-radius: 5px;
     }
 
-    .stTabs [aria-selected="true"] {
+    .stRadio [role="radiogroup"] label:has(input:checked) {
         background-color: var(--primary-color) !important;
         color: var(--text-light) !important;
     }
@@ -124,6 +128,12 @@ custom_css = """
 </style>
 """
 
+VIEWS = {
+    "📝 Add/Update Expenses": ("Add or Update Expenses", add_update_tab),
+    "📊 Category Analytics": ("Expense Categories Analysis", analytics_category_tab),
+    "📈 Monthly Trends": ("Monthly Expense Trends", analytics_months_tab),
+}
+
 
 def main():
     # Page configuration
@@ -145,36 +155,35 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
-    # Create tabs with custom styling
-    tab1, tab2, tab3 = st.tabs([
-        "📝 Add/Update Expenses",
-        "📊 Category Analytics",
-        "📈 Monthly Trends"
-    ])
-
-    with tab1:
-        st.markdown("""
-            <div style='background-color: #FFFFFF; padding: 1rem; border-radius: 10px; margin-bottom: 1rem;'>
-                <h2 style='color: #2C3E50; font-size: 1.5rem;'>Add or Update Expenses</h2>
-            </div>
-        """, unsafe_allow_html=True)
-        add_update_tab()
-
-    with tab2:
-        st.markdown("""
-            <div style='background-color: #FFFFFF; padding: 1rem; border-radius: 10px; margin-bottom: 1rem;'>
-                <h2 style='color: #2C3E50; font-size: 1.5rem;'>Expense Categories Analysis</h2>
-            </div>
-        """, unsafe_allow_html=True)
-        analytics_category_tab()
-
-    with tab3:
-        st.markdown("""
-            <div style='background-color: #FFFFFF; padding: 1rem; border-radius: 10px; margin-bottom: 1rem;'>
-                <h2 style='color: #2C3E50; font-size: 1.5rem;'>Monthly Expense Trends</h2>
-            </div>
-        """, unsafe_allow_html=True)
-        analytics_months_tab()
+    # One /dashboard call fills the client cache with the initial data of every view. If it
+    # fails, each view still loads (and reports errors for) its own data.
+    try:
+        api_client.load_dashboard(
+            add_update.DEFAULT_DATE,
+            analytics_by_category.DEFAULT_START_DATE,
+            analytics_by_category.DEFAULT_END_DATE,
+            *analytics_by_months.default_range()
+        )
+    except requests.exceptions.RequestException:
+        pass
+
+    # Only the selected view runs, so the other views' API calls and charts are skipped.
+    # Each view is an st.fragment: widgets inside it rerun that view alone.
+    selected = st.radio(
+        "View",
+        list(VIEWS),
+        horizontal=True,
+        key="active_view",
+        label_visibility="collapsed"
+    )
+    title, render = VIEWS[selected]
+
+    st.markdown(f"""
+        <div style='background-color: #FFFFFF; padding: 1rem; border-radius: 10px; margin-bottom: 1rem;'>
+            <h2 style='color: #2C3E50; font-size: 1.5rem;'>{title}</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    render()
 
     # Footer
     st.markdown("""
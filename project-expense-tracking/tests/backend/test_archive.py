@@ -0,0 +1,98 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from backend import archive, db_helper, export
+
+
+def test_only_years_outside_the_keep_window_are_closed(monkeypatch):
+    monkeypatch.setattr(archive.config, "ARCHIVE_KEEP_YEARS", 2)
+
+    assert archive.is_closed(2023, today=date(2025, 3, 1))
+    assert not archive.is_closed(2024, today=date(2025, 3, 1))
+
+
+def test_year_segments_alternate_between_live_and_archived_years():
+    archives = {2022: {"year": 2022}, 2023: {"year": 2023}}
+
+    segments = db_helper._year_segments(date(2021, 3, 1), date(2025, 2, 1), archives)
+
+    assert segments == [
+        (date(2021, 3, 1), date(2021, 12, 31), None),
+        (date(2022, 1, 1), date(2022, 12, 31), archives[2022]),
+        (date(2023, 1, 1), date(2023, 12, 31), archives[2023]),
+        (date(2024, 1, 1), date(2025, 2, 1), None),
+    ]
+
+
+def test_parquet_archive_reads_back_by_date_and_category(tmp_path):
+    pytest.importorskip("pyarrow")
+    rows = [{"id": i, "expense_date": date(2022, 1, 1 + i // 3), "amount": Decimal("1.50"),
+             "category": "Food" if i % 2 else "Rent", "notes": "n"} for i in range(30)]
+    path = tmp_path / "expenses_2022.parquet"
+    with open(path, "wb") as f:
+        for chunk in export.parquet_stream([rows[:10], rows[10:]]):
+            f.write(chunk)
+
+    day = export.read_parquet_rows(str(path), date(2022, 1, 2), date(2022, 1, 2))
+    batches = list(export.iter_parquet_batches(str(path), date(2022, 1, 2), date(2022, 1, 5), "Food", batch_size=4))
+
+    assert day == rows[3:6]
+    assert [row["id"] for batch in batches for row in batch] == [3, 5, 7, 9, 11, 13]
+
+
+def test_expense_pages_cross_from_archived_into_live_years(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    archived = [{"id": i, "expense_date": date(2022, 12, 30 + i % 2), "amount": Decimal("1.00"),
+                 "category": "Food", "notes": ""} for i in range(4)]
+    archived.sort(key=lambda row: (row["expense_date"], row["id"]))
+    path = tmp_path / "expenses_2022.parquet"
+    with open(path, "wb") as f:
+        for chunk in export.parquet_stream([archived]):
+            f.write(chunk)
+    live = [{"id": 10 + i, "expense_date": date(2023, 1, 1), "amount": Decimal("2.00"),
+             "category": "Food", "notes": ""} for i in range(3)]
+    calls = []
+
+    def live_page(start_date, end_date, category, after, limit):
+        calls.append((start_date, end_date))
+        return [row for row in live if (start_date is None or row["expense_date"] >= start_date)
+                and (end_date is None or row["expense_date"] <= end_date)
+                and (not after or (row["expense_date"], row["id"]) > after)][:limit]
+
+    monkeypatch.setattr(db_helper, "fetch_archives", lambda: [{"year": 2022, "path": str(path)}])
+    monkeypatch.setattr(db_helper, "_live_expenses_page", live_page)
+
+    first = db_helper.fetch_expenses_page(limit=3)
+    last = first[-1]
+    second = db_helper.fetch_expenses_page(after=(last["expense_date"], last["id"]), limit=3)
+
+    assert [row["id"] for row in first] == [0, 2, 1]
+    assert [row["id"] for row in second] == [3, 10, 11]
+    assert calls[0] == (None, date(2021, 12, 31))
+    assert db_helper._page_segments(date(2023, 2, 1), None, {2022: {}}) == [(date(2023, 2, 1), None, None)]
+
+
+def test_deep_archived_page_skips_row_groups_before_the_cursor(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    rows = [{"id": i, "expense_date": date(2022, 1, 1 + i // 4), "amount": Decimal("1.00"),
+             "category": "Food", "notes": ""} for i in range(100)]
+    path = tmp_path / "expenses_2022.parquet"
+    with open(path, "wb") as f:
+        for chunk in export.parquet_stream([rows[i:i + 10] for i in range(0, 100, 10)]):
+            f.write(chunk)
+    read_groups = []
+    iter_batches = export.pq.ParquetFile.iter_batches
+
+    def spy(self, *args, row_groups=None, **kwargs):
+        read_groups.extend(row_groups)
+        return iter_batches(self, *args, row_groups=row_groups, **kwargs)
+
+    monkeypatch.setattr(export.pq.ParquetFile, "iter_batches", spy)
+
+    page = db_helper._archived_expenses_page(str(path), date(2022, 1, 1), date(2022, 12, 31), None,
+                                             (date(2022, 1, 19), 75), 10)
+
+    assert [row["id"] for row in page] == list(range(76, 86))
+    assert min(read_groups) == 7
@@ -0,0 +1,92 @@
+import random
+import statistics
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from backend import budgets
+
+
+def test_welford_add_and_remove_match_batch_statistics():
+    rng = random.Random(7)
+    values = [rng.uniform(1, 500) for _ in range(200)]
+    stats = (0, 0.0, 0.0)
+    for value in values:
+        stats = budgets.welford_add(stats, value)
+    for value in values[:50]:
+        stats = budgets.welford_remove(stats, value)
+
+    kept = values[50:]
+    assert stats[0] == len(kept)
+    assert stats[1] == pytest.approx(statistics.fmean(kept))
+    assert budgets.stddev(stats) == pytest.approx(statistics.stdev(kept))
+    assert budgets.welford_remove((1, 5.0, 0.0), 5.0) == (0, 0.0, 0.0)
+
+
+def test_day_changes_lists_only_changed_categories():
+    before = {"Food": Decimal("20.00"), "Rent": Decimal("900.00"), "Other": Decimal("5.00")}
+    after = {"Food": Decimal("35.00"), "Rent": Decimal("900.00"), "Shopping": Decimal("60.00")}
+    assert budgets.day_changes(before, after) == {
+        "Food": (Decimal("20.00"), Decimal("35.00")),
+        "Other": (Decimal("5.00"), None),
+        "Shopping": (None, Decimal("60.00")),
+    }
+
+
+def test_apply_change_flags_unusual_days_against_the_other_days(monkeypatch):
+    monkeypatch.setattr(budgets.config, "ALERT_MIN_DAYS", 5)
+    monkeypatch.setattr(budgets.config, "ALERT_Z_SCORE", 3.0)
+    stats = (0, 0.0, 0.0)
+    for value in [10, 12, 11, 9, 10, 13]:
+        stats = budgets.welford_add(stats, value)
+
+    unusual, baseline, z_score = budgets.apply_change(stats, None, Decimal("50"))
+    assert baseline == stats and unusual[0] == 7
+    assert z_score == pytest.approx((50 - stats[1]) / budgets.stddev(stats))
+
+    # Correcting the day back to a usual amount replaces it in the statistics.
+    corrected, _, z_score = budgets.apply_change(unusual, Decimal("50"), Decimal("11"))
+    assert z_score is None
+    assert corrected[0] == 7
+    assert corrected[1] == pytest.approx(statistics.fmean([10, 12, 11, 9, 10, 13, 11]))
+
+
+class FakeCursor:
+    def __init__(self, stats):
+        self.stats = stats
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        rows = []
+        for category in self.executed[-1][1]:
+            count, mean, m2 = self.stats.get(category, (0, 0.0, 0.0))
+            rows.append({"category": category, "day_count": count, "mean": mean, "m2": m2})
+        return rows
+
+
+def test_record_day_change_touches_only_changed_categories():
+    cursor = FakeCursor({"Food": (3, 20.0, 8.0)})
+    budgets.record_day_change(cursor, "2024-08-15", {"Food": Decimal("20.00"), "Rent": Decimal("900.00")},
+                              {"Food": Decimal("26.00"), "Rent": Decimal("900.00")})
+
+    assert cursor.executed[:2] == budgets.lock_statements({"Food": None})
+    updates = [params for sql, params in cursor.executed if sql == budgets.UPDATE_STATS_SQL]
+    assert updates == [(3, 22.0, pytest.approx(32.0), "Food")]
+    month_totals = [params for sql, params in cursor.executed if sql == budgets.ADD_MONTH_TOTAL_SQL]
+    assert month_totals == [(date(2024, 8, 1), "Food", Decimal("6.00"))]
+
+
+def test_summarize_reports_budget_status():
+    summary = budgets.summarize({"Food": Decimal("300.00"), "Rent": Decimal("900.00")},
+                                {"Food": Decimal("320.50"), "Other": Decimal("12.00")},
+                                {"Food": (10, 30.0, 90.0)})
+    assert [row["category"] for row in summary] == ["Food", "Other", "Rent"]
+    food, other, rent = summary
+    assert food["over_budget"] and food["remaining"] == Decimal("-20.50")
+    assert food["daily_stddev"] == pytest.approx((90 / 9) ** 0.5)
+    assert other["monthly_limit"] is None and not other["over_budget"]
+    assert rent["spent"] == 0 and rent["remaining"] == Decimal("900.00")
@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import Decimal
+
+from backend import bulk_import
+
+
+def run_import(data, fmt, batch_size=2, closed_years=()):
+    batches = []
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+    records = bulk_import.parse_records(bulk_import.iter_lines(chunks), fmt)
+    report = bulk_import.import_records(records, batch_size, write_batch=batches.append, closed_years=closed_years)
+    return report, batches
+
+
+def test_csv_import_batches_valid_rows_and_reports_rejects():
+    data = (
+        "expense_date,amount,category,notes\n"
+        "2024-08-01,10.50,Food,\"Lunch, with team\"\n"
+        "2024-08-01,abc,Food,bad amount\n"
+        "2024-08-02,3,Other,Parking\n"
+        "2024-13-01,1,Other,bad date\n"
+        "2024-08-03,7.25,Rent,\n"
+    ).encode()
+
+    report, batches = run_import(data, "csv")
+
+    assert batches == [
+        [(date(2024, 8, 1), Decimal("10.50"), "Food", "Lunch, with team"),
+         (date(2024, 8, 2), Decimal("3"), "Other", "Parking")],
+        [(date(2024, 8, 3), Decimal("7.25"), "Rent", "")],
+    ]
+    assert report["rows_read"] == 5
+    assert report["rows_imported"] == 3
+    assert [reject["line"] for reject in report["rejects"]] == [3, 5]
+
+
+def test_ndjson_import_rejects_bad_lines():
+    data = (
+        '{"expense_date": "2024-08-01", "amount": 1.5, "category": "Food", "notes": "x"}\n'
+        "not json\n"
+        "\n"
+        '{"expense_date": "2024-08-01", "amount": 1.555, "category": "Food"}\n'
+    ).encode()
+
+    report, batches = run_import(data, "ndjson")
+
+    assert batches == [[(date(2024, 8, 1), Decimal("1.5"), "Food", "x")]]
+    assert [reject["line"] for reject in report["rejects"]] == [2, 4]
+
+
+def test_rows_of_archived_years_are_rejected_without_aborting_the_import():
+    data = (
+        "expense_date,amount,category,notes\n"
+        "2024-08-01,1,Food,\n"
+        "2021-03-04,2,Food,archived\n"
+        "2024-08-02,3,Food,\n"
+    ).encode()
+
+    report, batches = run_import(data, "csv", batch_size=1, closed_years={2021})
+
+    assert [row[0] for batch in batches for row in batch] == [date(2024, 8, 1), date(2024, 8, 2)]
+    assert report["rejects"] == [{"line": 3, "error": "expenses of 2021 are archived and read-only"}]
+
+
+def test_import_stops_with_a_partial_report_when_a_year_is_archived_mid_import():
+    data = "expense_date,amount,category,notes\n" + "".join(
+        f"{year}-05-0{day},1,Food,\n" for year in (2024, 2024, 2023, 2024) for day in (1, 2)
+    )
+    committed = []
+
+    def write_batch(batch):
+        if any(row[0].year == 2023 for row in batch):
+            raise bulk_import.db_helper.ArchivedYearError("expenses of 2023 are archived and read-only")
+        committed.append(batch)
+
+    records = bulk_import.parse_records(bulk_import.iter_lines([data.encode()]), "csv")
+    report = bulk_import.import_records(records, 2, write_batch=write_batch, closed_years=())
+
+    assert len(committed) == 2
+    assert report["rows_imported"] == 4
+    assert report["rows_read"] == 6
+    assert report["failed_batch"] == {"batch": 3, "first_line": 6, "rows": 2,
+                                      "error": "expenses of 2023 are archived and read-only"}
+
+
+def test_iter_lines_handles_multibyte_characters_split_across_chunks():
+    text = "a,€\nb,ü"
+    encoded = text.encode()
+    chunks = [encoded[i:i + 1] for i in range(len(encoded))]
+    assert list(bulk_import.iter_lines(chunks)) == ["a,€\n", "b,ü"]
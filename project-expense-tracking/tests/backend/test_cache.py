@@ -0,0 +1,57 @@
+from datetime import date
+
+from backend.cache import LRUBackend, ResultCache
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.keys() == ["a", "c"]
+    assert backend.evictions == 1
+
+
+def test_lru_backend_expires_entries():
+    backend = LRUBackend(ttl=0)
+    backend.set("a", 1)
+    assert backend.get("a") is None
+
+
+def test_invalidate_date_drops_only_ranges_containing_the_date():
+    cache = ResultCache(LRUBackend())
+    august = cache.make_key("analytics", date(2024, 8, 1), date(2024, 8, 31))
+    september = cache.make_key("analytics", date(2024, 9, 1), date(2024, 9, 30))
+    everything = cache.make_key("monthly_summary")
+    for key in (august, september, everything):
+        cache.set(key, {"total": 1})
+
+    cache.invalidate_date(date(2024, 8, 15))
+
+    assert cache.get(august) is None
+    assert cache.get(september) == {"total": 1}
+    assert cache.get(everything) is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_set_skips_results_computed_before_an_invalidation():
+    cache = ResultCache(LRUBackend())
+    key = cache.make_key("monthly_summary")
+    generation = cache.generation
+    cache.invalidate_date(date(2024, 8, 15))
+
+    cache.set(key, [], generation)
+    assert cache.get(key) is None
+
+
+def test_entries_of_another_data_version_are_misses():
+    cache = ResultCache(LRUBackend())
+    key = cache.make_key("analytics", date(2024, 8, 1), date(2024, 8, 31))
+    cache.set(key, {"total": 1}, version=1)
+
+    assert cache.get(key, 1) == {"total": 1}
+    # A write committed (here or in another worker) before this worker invalidated.
+    assert cache.get(key, 2) is None
+    assert cache.stats()["misses"] == 1
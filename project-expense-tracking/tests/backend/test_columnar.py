@@ -0,0 +1,73 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from backend import columnar  # noqa: E402
+
+
+ROWS = [
+    {"expense_date": date(2024, 1, 31), "category": "Food", "total": Decimal("10.25"), "expense_count": 2},
+    {"expense_date": date(2024, 2, 1), "category": "Rent", "total": Decimal("1200.00"), "expense_count": 1},
+    {"expense_date": date(2024, 2, 1), "category": "Food", "total": Decimal("4.50"), "expense_count": 1},
+    {"expense_date": date(2025, 2, 3), "category": "Food", "total": Decimal("3.00"), "expense_count": 1},
+]
+
+
+def make_snapshot():
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.load(ROWS, version=7)
+    return snapshot
+
+
+def test_summary_sums_categories_in_range():
+    summary = make_snapshot().fetch_expense_summary(date(2024, 1, 1), date(2024, 12, 31))
+
+    assert sorted((row["category"], row["total"]) for row in summary) == [
+        ("Food", Decimal("14.75")), ("Rent", Decimal("1200.00")),
+    ]
+
+
+def test_monthly_summary_groups_calendar_months_across_years():
+    summary = make_snapshot().fetch_monthly_expense_summary()
+
+    assert [(row["month_name"], row["total"]) for row in summary] == [
+        ("January", Decimal("10.25")), ("February", Decimal("1207.50")),
+    ]
+
+
+def test_bucketed_totals_match_sql_row_shape():
+    snapshot = make_snapshot()
+
+    months = snapshot.fetch_bucketed_totals(date(2024, 1, 1), date(2025, 12, 31), "month")
+    weeks = snapshot.fetch_bucketed_totals(date(2024, 1, 1), date(2024, 12, 31), "week", by_category=True)
+    food = snapshot.fetch_bucketed_totals(date(2024, 1, 1), date(2025, 12, 31), "year", category="Food")
+
+    assert months == [
+        {"bucket": date(2024, 1, 1), "total": Decimal("10.25"), "expense_count": 2},
+        {"bucket": date(2024, 2, 1), "total": Decimal("1204.50"), "expense_count": 2},
+        {"bucket": date(2025, 2, 1), "total": Decimal("3.00"), "expense_count": 1},
+    ]
+    assert [(row["bucket"], row["category"]) for row in weeks] == [
+        (date(2024, 1, 29), "Food"), (date(2024, 1, 29), "Rent"),
+    ]
+    assert [(row["bucket"], row["total"]) for row in food] == [
+        (date(2024, 1, 1), Decimal("14.75")), (date(2025, 1, 1), Decimal("3.00")),
+    ]
+
+
+def test_replace_date_swaps_one_day_and_tracks_the_version():
+    snapshot = make_snapshot()
+
+    snapshot.replace_date(date(2024, 2, 1), [
+        {"expense_date": date(2024, 2, 1), "category": "Shopping", "total": Decimal("20.00"), "expense_count": 1},
+    ], version=8)
+
+    summary = snapshot.fetch_expense_summary(date(2024, 2, 1), date(2024, 2, 1))
+    assert summary == [{"category": "Shopping", "total": Decimal("20.00")}]
+    assert snapshot.version == 8
+    assert not snapshot.observe(8)
+    assert not snapshot.observe(7)  # read from a lagging replica
+    assert snapshot.observe(9) and not snapshot.serves("fetch_expense_summary")
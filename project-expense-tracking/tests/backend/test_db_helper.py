@@ -1,4 +1,10 @@
-from backend import db_helper
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from backend import async_db_helper, db_helper
 
 
 def test_fetch_expenses_for_date_aug_15():
@@ -19,3 +25,110 @@ def test_fetch_expenses_for_date_invalid_date():
 def test_fetch_expense_summary_invalid_range():
     summary = db_helper.fetch_expense_summary("2099-01-01", "2099-12-31")
     assert len(summary) == 0
+
+
+def test_replace_expenses_for_date_round_trip():
+    expenses = [
+        {"amount": 12.5, "category": "Food", "notes": "Lunch"},
+        {"amount": 3.0, "category": "Other", "notes": "Parking"},
+    ]
+    db_helper.replace_expenses_for_date("9999-01-01", expenses)
+    try:
+        stored = db_helper.fetch_expenses_for_date("9999-01-01")
+        assert sorted((e["category"], e["amount"]) for e in stored) == [("Food", 12.5), ("Other", 3.0)]
+    finally:
+        db_helper.replace_expenses_for_date("9999-01-01", [])
+
+    assert db_helper.fetch_expenses_for_date("9999-01-01") == []
+
+
+def test_rollups_follow_replaced_expenses():
+    db_helper.replace_expenses_for_date("9999-01-02", [
+        {"amount": 20.0, "category": "Food", "notes": ""},
+        {"amount": 5.0, "category": "Food", "notes": ""},
+    ])
+    try:
+        summary = db_helper.fetch_expense_summary("9999-01-02", "9999-01-02")
+        assert summary == [{"category": "Food", "total": 25.0}]
+    finally:
+        db_helper.replace_expenses_for_date("9999-01-02", [])
+
+    assert db_helper.fetch_expense_summary("9999-01-02", "9999-01-02") == []
+
+
+def test_plan_expense_diff_keeps_only_real_changes():
+    existing = [
+        {"id": 1, "amount": Decimal("10.00"), "category": "Food", "notes": "Lunch"},
+        {"id": 2, "amount": Decimal("5.00"), "category": "Other", "notes": "Bus"},
+        {"id": 3, "amount": Decimal("7.50"), "category": "Food", "notes": "Coffee"},
+    ]
+    upserts = [
+        {"id": 1, "amount": Decimal("10.00"), "category": "Food", "notes": "Lunch"},
+        {"id": 2, "amount": Decimal("5.00"), "category": "Other", "notes": "Train"},
+        {"id": None, "amount": Decimal("3.00"), "category": "Other", "notes": "Parking"},
+    ]
+
+    inserts, updates, deletes = db_helper.plan_expense_diff(existing, upserts, [3])
+
+    assert [e["notes"] for e in inserts] == ["Parking"]
+    assert [e["id"] for e in updates] == [2]
+    assert deletes == [3]
+
+
+def test_plan_expense_diff_rejects_ids_of_other_dates():
+    existing = [{"id": 1, "amount": Decimal("10.00"), "category": "Food", "notes": ""}]
+
+    with pytest.raises(db_helper.ExpenseNotFound):
+        db_helper.plan_expense_diff(existing, [], [99])
+
+
+def test_span_versions_follow_only_months_in_the_range():
+    rows = [
+        {"scope": "global", "version": 12},
+        {"scope": "2024-08", "version": 7},
+        {"scope": "2024-08-15", "version": 7},
+        {"scope": "2024-09", "version": 12},
+    ]
+    august = (date(2024, 8, 1), date(2024, 8, 31))
+    summer = (date(2024, 6, 1), date(2024, 9, 30))
+    spring = (date(2024, 3, 1), date(2024, 5, 31))
+
+    versions = db_helper.span_versions(rows, [august, summer, spring, (None, None)])
+
+    assert versions == {"global": 12, "spans": [7, 12, 0, 12]}
+
+
+def test_span_versions_query_reads_month_scopes_of_each_range():
+    query, params = db_helper.span_versions_query([(date(2024, 8, 3), date(2024, 9, 2)), (None, None)])
+
+    assert query.count("BETWEEN") == 1
+    assert params == ["2024-08", "2024-09"]
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, tuple(params)))
+
+    def fetchall(self):
+        return [{"version": 5}] if self.executed[-1][0] == db_helper.GLOBAL_VERSION_SQL else []
+
+
+class AsyncRecordingCursor(RecordingCursor):
+    async def execute(self, sql, params=()):
+        super().execute(sql, params)
+
+    async def fetchall(self):
+        return super().fetchall()
+
+
+def test_sync_and_async_date_writes_run_the_same_statements():
+    cursor, async_cursor = RecordingCursor(), AsyncRecordingCursor()
+
+    db_helper.record_date_write(cursor, "2024-08-15")
+    asyncio.run(async_db_helper.record_date_write(async_cursor, "2024-08-15"))
+
+    assert async_cursor.executed == cursor.executed
+    assert cursor.executed[-1] == (db_helper.SET_SCOPE_VERSIONS_SQL, ("2024-08-15", 5, "2024-08", 5))
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from backend.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.healthy
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        connection = FakeConnection()
+        opened.append(connection)
+        return connection
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_pool_prefills_min_size_and_reuses_connections():
+    pool, opened = make_pool(min_size=2, max_size=4)
+    assert len(opened) == 2
+
+    connection = pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+    assert len(opened) == 2
+
+
+def test_pool_times_out_when_exhausted():
+    pool, _ = make_pool(min_size=0, max_size=1, timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_hands_released_connection_to_waiter():
+    pool, _ = make_pool(min_size=0, max_size=1, timeout=2)
+    connection = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    while pool.stats()["waiters"] == 0:
+        pass
+    pool.release(connection)
+    waiter.join()
+
+    assert acquired == [connection]
+
+
+def test_pool_replaces_unhealthy_idle_connection():
+    pool, opened = make_pool(min_size=1, max_size=1, ping_interval=0)
+    opened[0].healthy = False
+
+    connection = pool.acquire()
+    assert connection is opened[1]
+    assert opened[0].closed
+    assert pool.stats()["size"] == 1
+
+
+def test_pool_discard_frees_slot():
+    pool, opened = make_pool(min_size=0, max_size=1)
+    connection = pool.acquire()
+    pool.release(connection, discard=True)
+
+    assert connection.closed
+    assert pool.stats()["size"] == 0
+    assert pool.acquire() is not connection
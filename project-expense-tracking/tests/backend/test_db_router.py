@@ -0,0 +1,93 @@
+import time
+
+from backend import db_router
+from backend.db_pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, lag):
+        self.lag = lag
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def make_replica(name, lag=0.0):
+    return db_router.Replica(name, ConnectionPool(lambda: FakeConnection(lag), min_size=0, max_size=2))
+
+
+def make_router(*replicas, max_lag=5.0):
+    return db_router.ReplicaRouter(replicas, lambda connection: connection.lag,
+                                   max_lag=max_lag, check_interval=60)
+
+
+def test_router_round_robins_over_current_replicas_only():
+    current_a, lagging, stopped, current_b = (
+        make_replica("a"), make_replica("lagging", lag=30.0), make_replica("stopped", lag=None), make_replica("b"),
+    )
+    router = make_router(current_a, lagging, stopped, current_b)
+
+    chosen = {router.choose().name for _ in range(4)}
+    assert chosen == {"a", "b"}
+    assert router.stats()["lagging"]["healthy"] is False
+    assert router.stats()["stopped"]["lag"] is None
+
+
+def test_router_skips_unhealthy_replica_until_next_check():
+    replica = make_replica("a")
+    router = make_router(replica)
+    assert router.choose() is replica
+
+    router.mark_unhealthy(replica, "connection refused")
+    assert router.choose() is None
+
+    replica.checked_at -= 60
+    assert router.choose() is replica
+
+
+def test_unreachable_replica_is_unhealthy():
+    def connect():
+        raise OSError("connection refused")
+
+    replica = db_router.Replica("down", ConnectionPool(connect, min_size=0, max_size=1))
+    router = make_router(replica)
+    assert router.choose() is None
+    assert "connection refused" in router.stats()["down"]["error"]
+
+
+def test_writes_pin_the_request_to_the_primary():
+    assert not db_router.replica_reads_allowed()  # outside a request
+
+    state, token = db_router.start_request()
+    try:
+        assert db_router.replica_reads_allowed()
+        with db_router.primary_only():
+            assert not db_router.replica_reads_allowed()
+        db_router.note_write(10)
+        assert not db_router.replica_reads_allowed()
+        assert state["primary_until"] > time.time()
+    finally:
+        db_router.end_request(token)
+
+    _, token = db_router.start_request(primary_until=time.time() + 10)
+    try:
+        assert not db_router.replica_reads_allowed()
+    finally:
+        db_router.end_request(token)
+
+
+def test_a_request_keeps_one_replica_and_falls_back_to_the_primary_if_it_fails():
+    a, b = make_replica("a"), make_replica("b")
+    router = make_router(a, b)
+    _, token = db_router.start_request()
+    try:
+        replica = db_router.request_replica(router)
+        assert all(db_router.request_replica(router) is replica for _ in range(4))
+
+        router.mark_unhealthy(replica, "lost connection")
+        assert db_router.request_replica(router) is None
+    finally:
+        db_router.end_request(token)
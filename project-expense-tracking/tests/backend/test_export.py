@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import db_helper, export, server
+
+
+def make_rows(count, start_id=1):
+    return [{"id": start_id + i, "expense_date": date(2024, 8, 1 + i % 28), "amount": Decimal("12.50"),
+             "category": "Food" if i % 2 else "Rent", "notes": f"note {i}, with comma"} for i in range(count)]
+
+
+def test_csv_stream_writes_the_header_once():
+    batches = [make_rows(3), make_rows(2, start_id=4)]
+
+    chunks = list(export.csv_stream(batches))
+    lines = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+
+    assert len(chunks) == 3
+    assert lines[0] == export.COLUMNS
+    assert [line[0] for line in lines[1:]] == ["1", "2", "3", "4", "5"]
+    assert lines[1][4] == "note 0, with comma"
+    assert sum(line == export.COLUMNS for line in lines) == 1
+
+
+def test_csv_stream_of_no_rows_is_only_the_header():
+    assert b"".join(export.csv_stream([])).decode().splitlines() == [",".join(export.COLUMNS)]
+
+
+def test_ndjson_stream_writes_one_object_per_line():
+    chunks = list(export.ndjson_stream([make_rows(2), make_rows(1, start_id=3)]))
+    lines = b"".join(chunks).decode().splitlines()
+
+    assert len(chunks) == 2
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+    assert json.loads(lines[0]) == {"id": 1, "expense_date": "2024-08-01", "amount": 12.5,
+                                    "category": "Rent", "notes": "note 0, with comma"}
+
+
+def test_parquet_stream_writes_one_row_group_per_batch_and_round_trips(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    batches = [make_rows(4), make_rows(3, start_id=5)]
+
+    chunks = list(export.parquet_stream(batches))
+    path = tmp_path / "export.parquet"
+    path.write_bytes(b"".join(chunks))
+
+    # Header chunk, one chunk per batch, then the footer.
+    assert len(chunks) == len(batches) + 1
+    assert chunks[0].startswith(b"PAR1") and chunks[-1].endswith(b"PAR1")
+    assert all(chunks[1:-1])
+    parquet_file = pq.ParquetFile(path)
+    assert [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)] == [4, 3]
+    assert parquet_file.read().to_pylist() == batches[0] + batches[1]
+
+
+def test_stream_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        export.stream("xml", [])
+
+
+def test_stream_expenses_filters_archived_and_live_years(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    archived = [{"id": i, "expense_date": date(2023, 12, 1 + i), "amount": Decimal("3.00"),
+                 "category": "Food" if i % 2 else "Rent", "notes": ""} for i in range(20)]
+    path = tmp_path / "expenses_2023.parquet"
+    path.write_bytes(b"".join(export.parquet_stream([archived])))
+    live_calls = []
+
+    def fake_live(start_date, end_date, category, batch_size):
+        live_calls.append((start_date, end_date, category))
+        yield [{"id": 100, "expense_date": date(2024, 1, 2), "amount": Decimal("1.00"),
+                "category": category, "notes": ""}]
+
+    monkeypatch.setattr(db_helper, "fetch_archives", lambda: [{"year": 2023, "path": str(path)}])
+    monkeypatch.setattr(db_helper, "_stream_live_expenses", fake_live)
+
+    rows = [row for rows in db_helper.stream_expenses(date(2023, 12, 10), date(2024, 1, 5), "Food")
+            for row in rows]
+
+    assert [row["id"] for row in rows] == [9, 11, 13, 15, 17, 19, 100]
+    assert live_calls == [(date(2024, 1, 1), date(2024, 1, 5), "Food")]
+
+
+def test_export_endpoint_streams_the_requested_range(monkeypatch):
+    calls = []
+
+    def fake_stream_expenses(start_date, end_date, category, batch_size):
+        calls.append((start_date, end_date, category))
+        yield make_rows(2)
+        yield make_rows(1, start_id=3)
+
+    monkeypatch.setattr(server.db_helper, "stream_expenses", fake_stream_expenses)
+    client = TestClient(server.app)
+
+    response = client.get("/export", params={"start_date": "2024-08-01", "end_date": "2024-08-31",
+                                             "category": "Food", "format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="expenses_2024-08-01_2024-08-31.ndjson"' in response.headers["content-disposition"]
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [1, 2, 3]
+    assert calls == [(date(2024, 8, 1), date(2024, 8, 31), "Food")]
+
+
+def test_export_endpoint_rejects_unknown_formats():
+    response = TestClient(server.app).get("/export", params={"start_date": "2024-08-01",
+                                                             "end_date": "2024-08-31", "format": "xml"})
+
+    assert response.status_code == 422
@@ -0,0 +1,27 @@
+import json
+import logging
+
+import pytest
+
+from backend import logging_setup
+
+
+def test_setup_logger_is_idempotent():
+    logger = logging_setup.setup_logger("test_logging_setup")
+    logging_setup.setup_logger("test_logging_setup")
+    assert len(logger.handlers) == 1
+
+
+def test_json_formatter_renders_lazy_args():
+    record = logging.LogRecord("db_helper", logging.INFO, __file__, 1, "called with %s", ("2024-08-01",), None)
+    payload = json.loads(logging_setup.JsonFormatter().format(record))
+    assert payload["message"] == "called with 2024-08-01"
+    assert payload["logger"] == "db_helper"
+    assert payload["level"] == "INFO"
+
+
+def test_setup_logger_rejects_a_second_log_file():
+    logging_setup.setup_logger("test_logging_setup")
+
+    with pytest.raises(ValueError):
+        logging_setup.setup_logger("test_logging_setup_other", log_file="other.log")
@@ -0,0 +1,53 @@
+from backend import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "/expenses")
+
+    lines = histogram.render()
+
+    assert 'latency_seconds_bucket{route="/expenses",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/expenses",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/expenses",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/expenses"} 4' in lines
+
+
+def test_track_query_counts_rows_and_errors():
+    @metrics.track_query
+    def fetch(n):
+        if n < 0:
+            raise ValueError("negative")
+        return [{}] * n
+
+    name = f"{fetch.__module__}.fetch"
+    assert fetch(3) == [{}] * 3
+    try:
+        fetch(-1)
+    except ValueError:
+        pass
+
+    assert metrics.DB_QUERY_ROWS._values[(name,)] == 3
+    assert metrics.DB_QUERY_ERRORS._values[(name,)] == 1
+    assert metrics.DB_QUERY_DURATION._series[(name,)][2] == 2
+
+
+def test_track_query_records_generator_when_closed_early():
+    closed = []
+
+    @metrics.track_query
+    def batches():
+        try:
+            yield [1, 2]
+            yield [3]
+        finally:
+            closed.append(True)
+
+    name = f"{batches.__module__}.batches"
+    stream = batches()
+    assert next(stream) == [1, 2]
+    stream.close()
+
+    assert closed == [True]
+    assert metrics.DB_QUERY_ROWS._values[(name,)] == 2
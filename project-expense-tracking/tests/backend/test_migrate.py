@@ -0,0 +1,16 @@
+from backend import migrate
+
+
+def test_migrations_are_numbered_without_gaps():
+    versions = [version for version, _, _ in migrate.load_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_split_statements_skips_comments_and_blank_statements():
+    sql = """-- header comment
+    CREATE TABLE t (id int);
+
+    -- another comment
+    INSERT INTO t VALUES (1);
+    """
+    assert migrate.split_statements(sql) == ["CREATE TABLE t (id int)", "INSERT INTO t VALUES (1)"]
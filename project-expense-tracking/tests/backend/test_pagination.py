@@ -0,0 +1,17 @@
+from datetime import date
+
+import pytest
+
+from backend.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(date(2024, 8, 15), 42)
+    assert "=" not in token
+    assert decode_cursor(token, 2) == ["2024-08-15", 42]
+
+
+@pytest.mark.parametrize("token", ["not-base64!", encode_cursor(1), "e30"])
+def test_decode_cursor_rejects_malformed_tokens(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, 2)
@@ -0,0 +1,17 @@
+import pytest
+
+from backend.search import MAX_TERMS, InvalidQuery, to_boolean_query
+
+
+def test_words_are_required_prefixes():
+    assert to_boolean_query("Uber rid") == "+Uber* +rid*"
+
+
+def test_quoted_phrases_are_kept_and_operators_dropped():
+    assert to_boolean_query('"uber  eats" -taxi (ride)*') == '+"uber eats" +taxi* +ride*'
+
+
+@pytest.mark.parametrize("text", ["", "  +-*() ", '""', " ".join(["w"] * (MAX_TERMS + 1))])
+def test_rejects_empty_or_oversized_queries(text):
+    with pytest.raises(InvalidQuery):
+        to_boolean_query(text)
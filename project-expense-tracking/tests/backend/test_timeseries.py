@@ -0,0 +1,49 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from backend import timeseries
+
+
+@pytest.mark.parametrize("bucket, expected", [
+    ("day", date(2024, 8, 14)),
+    ("week", date(2024, 8, 12)),
+    ("month", date(2024, 8, 1)),
+    ("quarter", date(2024, 7, 1)),
+    ("year", date(2024, 1, 1)),
+])
+def test_bucket_start(bucket, expected):
+    assert timeseries.bucket_start(date(2024, 8, 14), bucket) == expected
+
+
+@pytest.mark.parametrize("bucket", timeseries.BUCKETS)
+def test_count_buckets_matches_iteration(bucket):
+    start, end = date(2023, 11, 29), date(2025, 2, 3)
+    assert timeseries.count_buckets(start, end, bucket) == len(list(timeseries.iter_buckets(start, end, bucket)))
+
+
+def test_fill_series_keeps_years_apart_and_fills_gaps():
+    rows = [
+        {"bucket": date(2024, 8, 1), "total": Decimal("10.00"), "expense_count": 2},
+        {"bucket": date(2025, 8, 1), "total": Decimal("4.50"), "expense_count": 1},
+    ]
+
+    series = timeseries.fill_series(rows, date(2024, 7, 1), date(2025, 8, 31), "month")
+
+    assert len(series) == 14
+    assert series[1] == {"period": date(2024, 8, 1), "label": "Aug 2024", "total": Decimal("10.00"), "expense_count": 2}
+    assert series[2]["total"] == 0
+    assert series[-1]["label"] == "Aug 2025"
+    assert series[-1]["total"] == Decimal("4.50")
+
+
+def test_fill_series_by_category_fills_every_category():
+    rows = [{"bucket": date(2024, 1, 1), "category": "Food", "total": Decimal(3), "expense_count": 1}]
+
+    series = timeseries.fill_series(rows, date(2024, 1, 1), date(2024, 1, 14), "week", by_category=True)
+
+    assert [(point["label"], point["category"], point["total"]) for point in series] == [
+        ("2024-W01", "Food", Decimal(3)),
+        ("2024-W02", "Food", 0),
+    ]
@@ -0,0 +1,14 @@
+from decimal import Decimal
+
+from backend.trends import compute_trends
+
+
+def test_compute_trends_runs_forward_in_time():
+    series = [{"label": label, "total": Decimal(total)} for label, total in
+              [("Jan", 100), ("Feb", 150), ("Mar", 0), ("Apr", 30)]]
+
+    trends = compute_trends(series, window=3)
+
+    assert [point["change"] for point in trends] == [None, 50, -150, 30]
+    assert [point["change_pct"] for point in trends] == [None, 50.0, -100.0, None]
+    assert [point["rolling_avg"] for point in trends] == [None, None, Decimal(250) / 3, 60]
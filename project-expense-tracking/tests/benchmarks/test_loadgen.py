@@ -0,0 +1,55 @@
+import asyncio
+from datetime import date
+
+import httpx
+import pytest
+
+from benchmarks import datagen, loadgen
+
+
+def test_add_years_clamps_leap_days():
+    assert datagen.add_years(date(2024, 2, 29), 1) == date(2025, 2, 28)
+    assert datagen.add_years(date(2024, 2, 29), 4) == date(2028, 2, 29)
+    assert datagen.add_years(date(2023, 1, 1), 2) == date(2025, 1, 1)
+
+
+def test_generate_rows_is_deterministic_and_pays_rent_monthly():
+    rows = list(datagen.generate_rows(date(2024, 1, 30), 3, 5, seed=7))
+
+    assert rows == list(datagen.generate_rows(date(2024, 1, 30), 3, 5, seed=7))
+    assert len(rows) == 15
+    assert [row[2] for row in rows if row[0] == date(2024, 2, 1)][0] == "Rent"
+    assert all(row[1] > 0 and row[1].as_tuple().exponent == -2 for row in rows if row[2] != "Rent")
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+
+    assert loadgen.percentile(values, 50) == 50
+    assert loadgen.percentile(values, 99) == 99
+    assert loadgen.percentile([3], 95) == 3
+    assert loadgen.percentile([], 95) is None
+
+
+def test_parse_mix_rejects_unknown_operations():
+    assert loadgen.parse_mix("get_expenses=3, analytics") == {"get_expenses": 3.0, "analytics": 1.0}
+    with pytest.raises(ValueError):
+        loadgen.parse_mix("delete_everything=1")
+
+
+def test_run_reports_each_endpoint_of_the_mix():
+    def handler(request):
+        return httpx.Response(500 if request.url.path == "/monthly_summary/" else 200, json=[])
+
+    async def drive():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+            return await loadgen.run(client, {"get_expenses": 1, "monthly_summary": 1}, users=4,
+                                     duration=0.2, start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+
+    report = asyncio.run(drive())
+
+    assert set(report["endpoints"]) == {"get_expenses", "monthly_summary"}
+    assert report["endpoints"]["get_expenses"]["errors"] == 0
+    assert report["endpoints"]["monthly_summary"]["errors"] == report["endpoints"]["monthly_summary"]["requests"]
+    assert report["total"]["requests"] == sum(report["statuses"].values())
+    assert report["total"]["throughput_rps"] > 0
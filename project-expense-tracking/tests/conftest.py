@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The backend modules import each other by bare name (they are run from backend/ by uvicorn).
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "backend"))